@@ -1,10 +1,14 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import os
 import json
+import threading
+import time
+from categorizacao import ArmazemCargos
+from dados import DatasetAoVivo, normalizar_texto
 
 st.set_page_config(
     page_title="Dashboard RH - Análise de Colaboradores", layout="wide", page_icon="📊"
@@ -35,19 +39,123 @@ st.markdown(
 
 # ============ CONFIGURAÇÕES ============
 
+def agrupar_cargos_niveis(cargos_niveis):
+    """Agrupa os cargos pela chave normalizada (sem acentos, maiúsculas, espaços colapsados)."""
+    grupos = {}
+    for cargo, nivel in cargos_niveis.items():
+        grupos.setdefault(normalizar_texto(cargo), {})[cargo] = nivel
+    return grupos
+
+
+def resolver_nivel(grupo):
+    """
+    Nível de uma chave normalizada com um ou mais cargos ("BIOQUIMICO" e "BIOQUÍMICO")
+
+    Vale o primeiro nível classificado do grupo; "Não Classificado" só se
+    nenhum cargo da chave foi classificado. A mesma regra vale na carga e no
+    hot reload, então o nível não muda sem uma edição.
+    """
+    niveis = list(grupo.values())
+    return next((n for n in niveis if n != "Não Classificado"), niveis[0])
+
+
+def indexar_cargos_niveis(cargos_niveis):
+    """Indexa o mapeamento pela chave normalizada, resolvendo colisões com resolver_nivel."""
+    return {chave: resolver_nivel(grupo) for chave, grupo in agrupar_cargos_niveis(cargos_niveis).items()}
+
+
+class NiveisAoVivo:
+    """
+    Níveis por cargo acompanhando o cargos_niveis.json sem recarregar os dados
+
+    Os dados em cache são classificados com `base` (o mapeamento de quando o
+    objeto foi criado). A cada rerun só as linhas novas do diário do
+    categorizador são lidas, e `alterados` guarda as chaves cujo nível mudou
+    desde a base; aplicar_niveis_atuais() corrige só as linhas desses cargos.
+    """
+
+    def __init__(self, arquivo):
+        self.armazem = ArmazemCargos(arquivo)
+        mapeamento, self.versao, self.geracao = self.armazem.copia()
+        self._grupos = agrupar_cargos_niveis(mapeamento)
+        self.base = {chave: resolver_nivel(grupo) for chave, grupo in self._grupos.items()}
+        self.atual = dict(self.base)
+        self.alterados = {}
+        self.token = id(self)  # identifica a base com que os dados foram classificados
+        self._coluna = None  # (chave, Nivel) da última aplicação, ver aplicar_niveis_atuais
+        self._lock = threading.Lock()
+
+    def sincronizar(self):
+        """Retorna (índice atual, {chave normalizada: nível} dos que mudaram desde a base)"""
+        with self._lock:
+            mudancas, versao, geracao = self.armazem.mudancas_desde(self.versao, self.geracao)
+            if mudancas is None:
+                # Compactação ou JSON regravado: refaz o índice e compara tudo com a base
+                mapeamento, versao, geracao = self.armazem.copia()
+                self._grupos = agrupar_cargos_niveis(mapeamento)
+                self.atual = {chave: resolver_nivel(grupo) for chave, grupo in self._grupos.items()}
+                chaves = self.base.keys() | self.atual.keys()
+            else:
+                chaves = set()
+                for cargo, nivel in mudancas.items():
+                    chave = normalizar_texto(cargo)
+                    grupo = self._grupos.setdefault(chave, {})
+                    grupo[cargo] = nivel
+                    self.atual[chave] = resolver_nivel(grupo)
+                    chaves.add(chave)
+            for chave in chaves:
+                nivel = self.atual.get(chave, "OUTROS")
+                if nivel == self.base.get(chave, "OUTROS"):
+                    self.alterados.pop(chave, None)
+                else:
+                    self.alterados[chave] = nivel
+            self.versao, self.geracao = versao, geracao
+            return self.atual, dict(self.alterados)
+
+    def conflitos(self):
+        """Chaves normalizadas cujos cargos têm níveis diferentes: {chave: {cargo: nível}}"""
+        with self._lock:
+            return {
+                chave: dict(grupo)
+                for chave, grupo in self._grupos.items()
+                if len(set(grupo.values())) > 1
+            }
+
+    def coluna_nivel(self, df, alterados, calcular):
+        """
+        Coluna Nivel para o df, calculada uma vez por (carga dos dados, níveis alterados)
+
+        As sessões recebem cópias rasas do mesmo DataFrame; a coluna corrigida é
+        compartilhada entre elas até a próxima mudança do mapeamento ou dos dados.
+        """
+        chave = (df.attrs.get("carga"), df.attrs.get("niveis_base"), frozenset(alterados.items()))
+        with self._lock:
+            if self._coluna is not None and self._coluna[0] == chave:
+                return self._coluna[1]
+        nivel = calcular(df)
+        with self._lock:
+            self._coluna = (chave, nivel)
+        return nivel
+
+
+@st.cache_resource
+def obter_niveis():
+    return NiveisAoVivo('cargos_niveis.json')
+
+
 def load_cargos_niveis():
-    """Carrega o mapeamento de cargos do arquivo JSON."""
+    """Mapeamento atual (JSON + diário do categorizador) e os níveis alterados desde a carga dos dados."""
     try:
-        with open('cargos_niveis.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return obter_niveis().sincronizar()
     except FileNotFoundError:
         st.error("Arquivo 'cargos_niveis.json' não encontrado.")
-        return {}
+        return {}, {}
     except json.JSONDecodeError:
         st.error("Erro ao decodificar o arquivo 'cargos_niveis.json'.")
-        return {}
+        return {}, {}
 
-CARGOS_NIVEIS = load_cargos_niveis()
+
+CARGOS_NIVEIS_NORMALIZADOS, NIVEIS_ALTERADOS = load_cargos_niveis()
 
 # Mapeamento de cidades por Nome Fantasia
 CIDADES_MAPA = {
@@ -206,12 +314,31 @@ CIDADES_MAPA = {
 # ============ FUNÇÕES DE CLASSIFICAÇÃO ============
 
 
-def classificar_nivel(cargo):
+def classificar_nivel(cargo, indice=None):
     """Classifica o cargo em um nível hierárquico"""
     if pd.isna(cargo):
         return "NÃO CLASSIFICADO"
 
-    return CARGOS_NIVEIS.get(cargo, "OUTROS")
+    indice = CARGOS_NIVEIS_NORMALIZADOS if indice is None else indice
+    return indice.get(normalizar_texto(cargo), "OUTROS")
+
+
+def classificar_niveis(cargos, indice=None):
+    """Classifica uma coluna de cargos consultando o mapeamento uma vez por cargo distinto"""
+    categorias = cargos.astype("category")
+    niveis = np.array(
+        [classificar_nivel(c, indice) for c in categorias.cat.categories] + ["NÃO CLASSIFICADO"],
+        dtype=object,
+    )
+    # Código -1 (cargo vazio) aponta para o último item: "NÃO CLASSIFICADO"
+    return pd.Series(niveis[categorias.cat.codes.to_numpy()], index=cargos.index)
+
+
+def cargos_sem_nivel(cargos):
+    """Cargos (com a quantidade de linhas) que não existem no cargos_niveis.json"""
+    contagem = cargos.dropna().value_counts()
+    encontrados = [normalizar_texto(c) in CARGOS_NIVEIS_NORMALIZADOS for c in contagem.index]
+    return contagem[~np.array(encontrados, dtype=bool)]
 
 
 def classificar_linha_cuidado(nome_fantasia, centro_custo):
@@ -280,46 +407,16 @@ def agrupar_tipos_rescisao(tipo_rescisao):
 # ============ CARREGAMENTO E PROCESSAMENTO DE DADOS ============
 
 
-@st.cache_data
-def load_and_process_data():
-    """Carrega e processa os dados do arquivo Excel oris.xlsx"""
-
-    # Caminho do arquivo
-    caminho_arquivo = os.path.join(os.path.dirname(__file__), "oris.xlsx")
+def processar_oris(df, niveis=None):
+    """Classificações e colunas derivadas do oris (roda na thread de atualização: sem st.*)"""
 
-    if not os.path.exists(caminho_arquivo):
-        st.error(f"❌ Arquivo 'oris.xlsx' não encontrado na pasta do projeto!")
-        st.info(
-            "Certifique-se de que o arquivo 'oris.xlsx' está na mesma pasta do arquivo dashboard_rh.py"
-        )
-        st.stop()
-
-    # Carregar Excel (cabeçalho na linha 8 = header=7 pois é zero-indexed)
-    df = pd.read_excel(caminho_arquivo, header=7)
-
-    # Remover linhas completamente vazias
-    df = df.dropna(how="all")
-
-    # Converter datas
-    date_columns = [
-        "Dt Admissão",
-        "Dt Rescisão",
-        "Dt Nascimento",
-        "Dt Início Cargo",
-        "Dt Início Centro de Custo",
-        "Dt Início Empresa",
-        "Dt Início Escala",
-        "Dt Início Local de Trabalho",
-        "Dt Início Situação",
-        "Dt Início Tipo Funcionário",
-    ]
-
-    for col in date_columns:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce", dayfirst=True)
-
-    # Classificações
-    df["Nivel"] = df["Cargo"].apply(classificar_nivel)
+    # Classificações (Nivel pela base do NiveisAoVivo; mudanças posteriores entram sem recarregar)
+    if niveis is not None:
+        df["Nivel"] = classificar_niveis(df["Cargo"], niveis.base)
+        df.attrs["niveis_base"] = niveis.token
+    else:
+        df["Nivel"] = classificar_niveis(df["Cargo"], {})
+    df.attrs["carga"] = time.time_ns()  # identifica esta carga no cache da coluna Nivel
     df["Linha de Cuidado"] = df.apply(
         lambda x: classificar_linha_cuidado(
             x["Nome Fantasia"] if "Nome Fantasia" in df.columns else "",
@@ -353,6 +450,75 @@ def load_and_process_data():
     return df
 
 
+@st.cache_resource
+def obter_dados_oris():
+    """Oris processado, compartilhado entre sessões e renovado quando o arquivo muda"""
+    try:
+        niveis = obter_niveis()
+    except (FileNotFoundError, json.JSONDecodeError):
+        niveis = None
+    return DatasetAoVivo("oris", processar=lambda df: processar_oris(df, niveis))
+
+
+def load_and_process_data():
+    """
+    Dados do oris (oris.xlsx, oris.db ou oris.parquet) sem esperar reprocessamento
+
+    Serve a versão anterior enquanto uma nova é processada; retorna None
+    enquanto a primeira carga do processo ainda está em segundo plano.
+    """
+    try:
+        # Cabeçalhos padronizados, linhas vazias removidas e datas já convertidas
+        return obter_dados_oris().obter(esperar=False)
+    except FileNotFoundError:
+        st.error(f"❌ Arquivo 'oris.xlsx' não encontrado na pasta do projeto!")
+        st.info(
+            "Certifique-se de que o arquivo 'oris.xlsx' está na mesma pasta do arquivo dashboard_rh.py"
+        )
+        st.stop()
+
+
+def mostrar_andamento(dados, nome):
+    """Barra de progresso da carga em segundo plano de um DatasetAoVivo"""
+    etapa, fracao = dados.andamento()
+    decorrido = time.time() - dados.inicio if dados.inicio else 0
+    st.progress(fracao, text=f"🔄 {nome}: {etapa or 'concluindo'}... ({decorrido:.0f}s)")
+
+
+def aplicar_niveis_atuais(df):
+    """
+    Atualiza o Nivel dos dados em cache para o mapeamento atual
+
+    Só as linhas cujo cargo teve o nível alterado desde a carga são
+    reescritas, e só uma vez por mudança (NiveisAoVivo.coluna_nivel); os
+    agregados do dashboard saem do df e acompanham sozinhos.
+    """
+    try:
+        niveis = obter_niveis()
+    except (FileNotFoundError, json.JSONDecodeError):
+        return df
+    if df.attrs.get("niveis_base") != niveis.token or NIVEIS_ALTERADOS:
+        # Coluna nova em vez de escrita in-place: o DataFrame base é compartilhado entre sessões
+        df["Nivel"] = niveis.coluna_nivel(
+            df, NIVEIS_ALTERADOS, lambda d: calcular_niveis_atuais(d, niveis.token, NIVEIS_ALTERADOS)
+        )
+    return df
+
+
+def calcular_niveis_atuais(df, token, alterados):
+    if df.attrs.get("niveis_base") != token:
+        # Dados classificados com outra base (cache de recursos limpo): refaz tudo
+        return classificar_niveis(df["Cargo"])
+
+    cargos = df["Cargo"].dropna().unique()
+    novos = {c: alterados[normalizar_texto(c)] for c in cargos if normalizar_texto(c) in alterados}
+    nivel = df["Nivel"].copy()
+    if novos:
+        linhas = df["Cargo"].isin(list(novos))
+        nivel[linhas] = df.loc[linhas, "Cargo"].map(novos)
+    return nivel
+
+
 def calcular_substituicoes(df, data_inicio, data_fim):
     """Calcula substituições: mesma vaga preenchida após demissão por OUTRA pessoa"""
 
@@ -413,11 +579,47 @@ st.title("📊 Dashboard RH - Análise de Colaboradores")
 # Carregar dados automaticamente
 try:
     df = load_and_process_data()
+    dados_oris = obter_dados_oris()
+    if df is None:
+        # Primeira carga do processo: ninguém fica preso no parse; a página se refaz até a troca
+        mostrar_andamento(dados_oris, "Carregando o oris")
+        time.sleep(1)
+        st.rerun()
+    df = aplicar_niveis_atuais(df)
     st.success(f"✅ Dados carregados: {len(df)} colaboradores")
+    st.caption(f"📂 Fonte: {dados_oris.descricao_fonte()}")
+    if dados_oris.atualizando:
+        st.info("🔄 Nova versão do oris encontrada: processando em segundo plano, os dados atuais seguem valendo.")
+        mostrar_andamento(dados_oris, "Nova versão do oris")
+    elif dados_oris.erro is not None:
+        st.warning(f"⚠️ A nova versão do oris não pôde ser carregada ({dados_oris.erro}); exibindo a anterior.")
 except Exception as e:
     st.error(f"❌ Erro ao carregar arquivo oris.xlsx: {e}")
     st.stop()
 
+# Reclassificações feitas no categorizador e uma nova versão do oris aparecem em
+# segundos, sem reprocessar os dados nesta sessão
+if hasattr(st, "fragment"):
+    carregado_em = dados_oris.carregado_em
+
+    @st.fragment(run_every="5s")
+    def acompanhar_categorizador():
+        dataset = obter_dados_oris()
+        try:
+            dataset.obter(esperar=False)  # confere a fonte (os.stat) e dispara a recarga em segundo plano
+        except FileNotFoundError:
+            pass  # arquivo sendo trocado: a versão atual segue valendo
+        if dataset.carregado_em != carregado_em:
+            st.rerun()
+        try:
+            _, alterados = obter_niveis().sincronizar()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if alterados != NIVEIS_ALTERADOS:
+            st.rerun()
+
+    acompanhar_categorizador()
+
 # ============ SIDEBAR: FILTROS E MAPA ============
 
 st.sidebar.header("🎯 Filtros")
@@ -496,6 +698,41 @@ periodo_fim = st.sidebar.date_input(
     format="DD/MM/YYYY",
 )
 
+# Cargos fora do cargos_niveis.json (entram no nível OUTROS)
+sem_nivel = cargos_sem_nivel(df["Cargo"])
+if len(sem_nivel) > 0:
+    st.sidebar.markdown("---")
+    with st.sidebar.expander(f"⚠️ Cargos sem nível ({len(sem_nivel)})"):
+        st.caption("Não encontrados em cargos_niveis.json; contam como OUTROS.")
+        st.dataframe(
+            sem_nivel.rename_axis("Cargo").reset_index(name="Colaboradores"),
+            hide_index=True,
+        )
+
+# Cargos que só diferem por acento/caixa e têm níveis diferentes no cargos_niveis.json
+try:
+    conflitos_nivel = obter_niveis().conflitos()
+except (FileNotFoundError, json.JSONDecodeError):
+    conflitos_nivel = {}
+if conflitos_nivel:
+    st.sidebar.markdown("---")
+    with st.sidebar.expander(f"⚠️ Cargos com níveis em conflito ({len(conflitos_nivel)})"):
+        st.caption(
+            "Grafias do mesmo cargo com níveis diferentes; vale o primeiro nível "
+            "classificado. Unifique-os no categorizador."
+        )
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    (cargo, nivel, resolver_nivel(grupo))
+                    for grupo in conflitos_nivel.values()
+                    for cargo, nivel in grupo.items()
+                ],
+                columns=["Cargo", "Nível no JSON", "Nível usado"],
+            ),
+            hide_index=True,
+        )
+
 # Converter para datetime
 periodo_inicio = pd.to_datetime(periodo_inicio, dayfirst=True)
 periodo_fim = pd.to_datetime(periodo_fim, dayfirst=True)
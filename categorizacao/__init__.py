@@ -0,0 +1,38 @@
+"""
+Apoio ao categorizador de cargos (categorizador_cargos.py)
+
+Uso:
+    from categorizacao import IndiceTrigramas
+    indice = IndiceTrigramas(cargos)
+    indice.buscar("enfermeiro")        # trechos primeiro, depois aproximados
+
+    from categorizacao import carregar_mapeamento, registrar
+    cargos = carregar_mapeamento()                 # snapshot + diário
+    registrar([("MEDICO", "Não Classificado", "MEDICOS")])
+
+    from categorizacao import ArmazemCargos
+    armazem = ArmazemCargos()                      # várias sessões/processos
+    gravadas, conflitos = armazem.salvar({"MEDICO": ("Não Classificado", "MEDICOS")})
+
+    from categorizacao import sugerir
+    sugerir(indice, cargos)    # [(cargo, categoria, confiança, vizinho), ...]
+"""
+
+from .armazenamento import ArmazemCargos, trava_arquivo
+from .busca import SIMILARIDADE_MINIMA, IndiceTrigramas, trigramas
+from .diario import (
+    ARQUIVO_MAPEAMENTO,
+    carregar_mapeamento,
+    compactar,
+    ler_diario,
+    ler_historico,
+    ler_versao_snapshot,
+    registrar,
+)
+from .sugestoes import (
+    CLASSIFICACAO_MANUAL,
+    CONFIANCA_MINIMA,
+    classificacao_manual,
+    sugerir,
+    sugerir_categoria,
+)
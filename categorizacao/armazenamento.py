@@ -0,0 +1,189 @@
+"""
+Mapeamento cargo -> categoria compartilhado entre sessões, com versão e trava de arquivo
+
+Cada registro do diário recebe um número de versão crescente. Uma sessão
+guarda a versão em que leu os dados e, ao salvar, envia só os cargos que
+alterou junto com o valor que viu; a gravação acontece sob uma trava de
+arquivo (vale entre processos) e recusa os cargos que outra pessoa mudou
+nesse meio tempo. As outras sessões recebem as mudanças remotas lendo só as
+linhas novas do diário, sem recarregar o JSON.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from .diario import (
+    ARQUIVO_MAPEAMENTO,
+    _gravar_atomico,
+    caminho_diario,
+    compactar,
+    ler_versao_snapshot,
+    registrar,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def trava_arquivo(arquivo=ARQUIVO_MAPEAMENTO):
+    """Trava exclusiva entre processos, num arquivo .lock ao lado do mapeamento"""
+    caminho = os.path.splitext(arquivo)[0] + ".lock"
+    with open(caminho, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _assinatura(caminho):
+    try:
+        info = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return info.st_size, info.st_mtime_ns
+
+
+class ArmazemCargos:
+    """Cópia em memória do mapeamento, acompanhando o diário de forma incremental"""
+
+    def __init__(self, arquivo=ARQUIVO_MAPEAMENTO):
+        self.arquivo = arquivo
+        self.mapeamento = {}
+        self.versao = 0
+        self.geracao = 0  # muda a cada recarga completa (compactação ou JSON regravado)
+        self._recentes = []  # registros lidos do diário desde a última recarga
+        self._versao_base = 0  # versão do snapshot na última recarga
+        self._posicao = 0  # bytes do diário já consumidos
+        self._identidade = None  # (st_dev, st_ino) do diário lido
+        self._snapshot = None  # assinatura do JSON na última recarga
+        self._lock = threading.Lock()
+        with self._travado():
+            self._recarregar()
+
+    @contextmanager
+    def _travado(self):
+        with self._lock, trava_arquivo(self.arquivo):
+            yield
+
+    def _recarregar(self):
+        with open(self.arquivo, "r", encoding="utf-8") as f:
+            self.mapeamento = json.load(f)
+        self._snapshot = _assinatura(self.arquivo)
+        self._versao_base = self.versao = ler_versao_snapshot(self.arquivo)
+        self._recentes, self._posicao, self._identidade = [], 0, None
+        self.geracao += 1
+        self._ler_diario()
+
+    def _ler_diario(self):
+        """Aplica as linhas novas do diário; False se ele foi trocado (exige recarga)"""
+        caminho = caminho_diario(self.arquivo)
+        try:
+            info = os.stat(caminho)
+        except FileNotFoundError:
+            return self._identidade is None
+        identidade = (info.st_dev, info.st_ino)
+        if self._identidade not in (None, identidade) or info.st_size < self._posicao:
+            return False
+
+        with open(caminho, "rb") as f:
+            f.seek(self._posicao)
+            dados = f.read()
+        fim = dados.rfind(b"\n") + 1  # só linhas completas; o resto fica para a próxima leitura
+        for linha in dados[:fim].splitlines():
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                continue
+            registro.setdefault("versao", self.versao + 1)
+            self.versao = max(self.versao, registro["versao"])
+            self.mapeamento[registro["cargo"]] = registro["para"]
+            self._recentes.append(registro)
+        self._posicao += fim
+        self._identidade = identidade
+        return True
+
+    def _sincronizar(self):
+        """Acompanha o disco: linhas novas do diário ou recarga se houve compactação/regravação"""
+        compactado = ler_versao_snapshot(self.arquivo) > self._versao_base
+        if compactado or _assinatura(self.arquivo) != self._snapshot or not self._ler_diario():
+            self._recarregar()
+
+    def copia(self):
+        """
+        Mapeamento atual, já acompanhando o disco
+
+        Returns:
+            Tupla (cópia do mapeamento {cargo: categoria}, versão, geração)
+        """
+        with self._travado():
+            self._sincronizar()
+            return dict(self.mapeamento), self.versao, self.geracao
+
+    def mudancas_desde(self, versao, geracao):
+        """
+        Mudanças gravadas por outras sessões depois de `versao`
+
+        Returns:
+            Tupla (mudanças {cargo: categoria} ou None se a sessão precisa
+            recarregar tudo, versão atual, geração atual)
+        """
+        with self._travado():
+            self._sincronizar()
+            if geracao != self.geracao:
+                return None, self.versao, self.geracao
+            mudancas = {r["cargo"]: r["para"] for r in self._recentes if r["versao"] > versao}
+            return mudancas, self.versao, self.geracao
+
+    def salvar(self, alteracoes):
+        """
+        Grava as alterações de uma sessão, recusando as que conflitam
+
+        Args:
+            alteracoes: {cargo: (categoria que a sessão viu, categoria nova)}
+
+        Returns:
+            Tupla (gravadas [(cargo, de, para)], conflitos [(cargo, vista, sua, atual)])
+        """
+        with self._travado():
+            self._sincronizar()
+            gravadas, conflitos = [], []
+            for cargo, (vista, nova) in alteracoes.items():
+                atual = self.mapeamento.get(cargo)
+                if atual == nova:
+                    continue
+                if atual != vista:
+                    # outra sessão mudou o cargo depois que esta leu
+                    conflitos.append((cargo, vista, nova, atual))
+                else:
+                    gravadas.append((cargo, atual, nova))
+
+            registrar(gravadas, self.arquivo, versao_inicial=self.versao + 1)
+            self._sincronizar()
+            return gravadas, conflitos
+
+    def substituir(self, mapeamento):
+        """
+        Troca o mapeamento inteiro (ex.: recriado por um script), sob a trava
+
+        O diário pendente é compactado antes, indo para o histórico; as
+        sessões abertas veem o JSON regravado e recarregam tudo.
+        """
+        with self._travado():
+            compactar(self.arquivo)
+            _gravar_atomico(self.arquivo, json.dumps(mapeamento, ensure_ascii=False, indent=4))
+            self._recarregar()
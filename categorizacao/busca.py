@@ -0,0 +1,128 @@
+"""
+Busca de cargos por trigramas, sem diferenciar acentos e maiúsculas
+
+Cada cargo normalizado é quebrado em trigramas (" MED", "MED", "EDI", ...).
+Uma busca por trecho intersecta as listas dos trigramas da consulta e só
+confere `in` nos poucos candidatos; a busca aproximada conta os trigramas em
+comum e ordena pela similaridade (Jaccard), como o pg_trgm do PostgreSQL.
+"""
+
+import heapq
+from collections import Counter
+
+from dados import normalizar_texto
+
+# Similaridade mínima para um resultado aproximado aparecer
+SIMILARIDADE_MINIMA = 0.3
+
+
+def trigramas(texto):
+    """Trigramas do texto já normalizado, com um espaço de borda em cada ponta"""
+    texto = f" {texto} "
+    return {texto[i : i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceTrigramas:
+    """Índice invertido trigrama -> cargos, montado uma vez para a lista de nomes"""
+
+    def __init__(self, nomes):
+        self.nomes = list(dict.fromkeys(nomes))
+        self.posicao = {n: i for i, n in enumerate(self.nomes)}
+        self.chaves = [normalizar_texto(n) for n in self.nomes]
+        self._trigramas = [trigramas(c) for c in self.chaves]
+        self._postings = {}
+        for i, trigs in enumerate(self._trigramas):
+            for t in trigs:
+                self._postings.setdefault(t, []).append(i)
+
+    def __len__(self):
+        return len(self.nomes)
+
+    def _contem(self, consulta, permitidos):
+        """Ids dos cargos que contêm a consulta como trecho"""
+        if len(consulta) < 3:
+            # Consulta curta demais para trigramas: confere direto
+            ids = range(len(self.chaves)) if permitidos is None else permitidos
+            return [i for i in ids if consulta in self.chaves[i]]
+
+        trigs = {consulta[i : i + 3] for i in range(len(consulta) - 2)}
+        listas = sorted((self._postings.get(t, ()) for t in trigs), key=len)
+        if not listas[0]:
+            return []
+        candidatos = set(listas[0])
+        for lista in listas[1:]:
+            candidatos.intersection_update(lista)
+            if not candidatos:
+                return []
+        if permitidos is not None:
+            candidatos &= permitidos
+        return [i for i in candidatos if consulta in self.chaves[i]]
+
+    def buscar(self, consulta, candidatos=None, limite=None, minimo=SIMILARIDADE_MINIMA):
+        """
+        Cargos que batem com a consulta, do mais para o menos parecido
+
+        Primeiro vêm os que contêm a consulta como trecho (nomes mais curtos
+        primeiro); depois os aproximados com similaridade >= minimo.
+
+        Args:
+            consulta: Texto digitado (acentos e caixa são ignorados)
+            candidatos: Conjunto de ids (posições em `nomes`) aos quais a busca se
+                restringe, ex.: os cargos de uma categoria; None = todos
+            limite: Máximo de resultados (None = todos)
+            minimo: Similaridade mínima dos resultados aproximados (None desliga a busca aproximada)
+
+        Returns:
+            Lista de nomes de cargo
+        """
+        consulta = normalizar_texto(consulta)
+        if not consulta:
+            return []
+
+        permitidos = candidatos
+        exatos = self._contem(consulta, permitidos)
+        ordem = lambda i: (len(self.chaves[i]), self.chaves[i])
+        if limite is not None and len(exatos) > limite:
+            exatos = heapq.nsmallest(limite, exatos, key=ordem)
+        else:
+            exatos.sort(key=ordem)
+        resultado = exatos
+
+        if minimo is not None and (limite is None or len(resultado) < limite):
+            ja = set(exatos)
+            aproximados = [
+                (-similaridade, self.chaves[i], i)
+                for i, similaridade in self.similares(consulta, permitidos, minimo)
+                if i not in ja
+            ]
+            aproximados.sort()
+            resultado = exatos + [i for _, _, i in aproximados]
+
+        if limite is not None:
+            resultado = resultado[:limite]
+        return [self.nomes[i] for i in resultado]
+
+    def similares(self, chave, candidatos=None, minimo=SIMILARIDADE_MINIMA):
+        """
+        Similaridade (Jaccard de trigramas) da chave com os cargos que têm algum trigrama em comum
+
+        Args:
+            chave: Texto já normalizado
+            candidatos: Conjunto de ids aos quais a comparação se restringe; None = todos
+            minimo: Similaridade mínima
+
+        Returns:
+            Lista de (id, similaridade), sem ordem definida
+        """
+        trigs = trigramas(chave)
+        comuns = Counter()
+        for t in trigs:
+            comuns.update(self._postings.get(t, ()))
+        resultado = []
+        for i, n in comuns.items():
+            if candidatos is not None and i not in candidatos:
+                continue
+            similaridade = n / (len(trigs) + len(self._trigramas[i]) - n)
+            if similaridade >= minimo:
+                resultado.append((i, similaridade))
+        return resultado
@@ -0,0 +1,238 @@
+"""
+Diário (journal) append-only das reclassificações de cargos
+
+Cada alteração vira uma linha JSON {"cargo", "de", "para", "em"} acrescentada
+ao cargos_niveis.diario.jsonl e sincronizada com fsync, então salvar custa
+O(alterações) e uma queda no meio da gravação perde no máximo a última linha.
+O mapeamento atual é o snapshot (cargos_niveis.json) com o diário reaplicado
+por cima. De tempos em tempos o diário é compactado: o snapshot é regravado
+com troca atômica e as linhas vão para o histórico, que guarda a auditoria.
+"""
+
+import glob
+import json
+import os
+from datetime import datetime
+
+ARQUIVO_MAPEAMENTO = "cargos_niveis.json"
+
+# Compacta quando o diário passar deste tamanho
+LIMITE_DIARIO_BYTES = 256 * 1024
+
+
+def caminho_diario(arquivo=ARQUIVO_MAPEAMENTO):
+    return os.path.splitext(arquivo)[0] + ".diario.jsonl"
+
+
+def caminho_historico(arquivo=ARQUIVO_MAPEAMENTO):
+    return os.path.splitext(arquivo)[0] + ".historico.jsonl"
+
+
+def caminho_compactando(arquivo=ARQUIVO_MAPEAMENTO, tamanho_historico=0):
+    """Diário posto de lado durante a compactação; o nome guarda o tamanho do histórico antes dela"""
+    return os.path.splitext(arquivo)[0] + f".compactando-{tamanho_historico}.jsonl"
+
+
+def caminho_versao(arquivo=ARQUIVO_MAPEAMENTO):
+    return os.path.splitext(arquivo)[0] + ".versao"
+
+
+def ler_versao_snapshot(arquivo=ARQUIVO_MAPEAMENTO):
+    """Versão do último registro já incorporado ao snapshot (0 se nunca compactado)"""
+    try:
+        with open(caminho_versao(arquivo), "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def ler_diario(arquivo=ARQUIVO_MAPEAMENTO, caminho=None):
+    """Registros do diário em ordem; uma última linha incompleta (queda na gravação) é ignorada"""
+    caminho = caminho or caminho_diario(arquivo)
+    if not os.path.exists(caminho):
+        return []
+    registros = []
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            try:
+                registros.append(json.loads(linha))
+            except ValueError:
+                continue
+    return registros
+
+
+def aplicar_registros(mapeamento, registros):
+    """Reaplica os registros (cada um define o valor final do cargo, então é idempotente)"""
+    for registro in registros:
+        mapeamento[registro["cargo"]] = registro["para"]
+    return mapeamento
+
+
+def carregar_mapeamento(arquivo=ARQUIVO_MAPEAMENTO):
+    """Snapshot JSON + diário reaplicado"""
+    with open(arquivo, "r", encoding="utf-8") as f:
+        mapeamento = json.load(f)
+    return aplicar_registros(mapeamento, ler_diario(arquivo))
+
+
+def registrar(alteracoes, arquivo=ARQUIVO_MAPEAMENTO, compactar_se_preciso=True, versao_inicial=None):
+    """
+    Acrescenta alterações ao diário e sincroniza com o disco
+
+    Args:
+        alteracoes: Lista de (cargo, categoria anterior, categoria nova)
+        arquivo: Snapshot JSON ao qual o diário pertence
+        compactar_se_preciso: Compactar quando o diário passar de LIMITE_DIARIO_BYTES
+        versao_inicial: Versão do primeiro registro (os seguintes somam 1); None = sem versão
+
+    Returns:
+        Quantidade de registros gravados
+    """
+    if not alteracoes:
+        return 0
+    agora = datetime.now().isoformat(timespec="seconds")
+    registros = [{"cargo": cargo, "de": de, "para": para, "em": agora} for cargo, de, para in alteracoes]
+    if versao_inicial is not None:
+        for i, registro in enumerate(registros):
+            registro["versao"] = versao_inicial + i
+    linhas = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in registros)
+    caminho = caminho_diario(arquivo)
+    if _termina_sem_quebra(caminho):
+        linhas = "\n" + linhas  # isola a linha incompleta deixada por uma queda
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write(linhas)
+        f.flush()
+        os.fsync(f.fileno())
+
+    if compactar_se_preciso and os.path.getsize(caminho) > LIMITE_DIARIO_BYTES:
+        compactar(arquivo)
+    return len(alteracoes)
+
+
+def _termina_sem_quebra(caminho):
+    if not os.path.exists(caminho) or os.path.getsize(caminho) == 0:
+        return False
+    with open(caminho, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+def _gravar_atomico(caminho, conteudo):
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(conteudo)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+
+def _arquivar(arquivo, separado, tamanho_historico):
+    """
+    Passa para o histórico as linhas de um diário posto de lado e o apaga
+
+    O histórico volta primeiro ao tamanho que tinha antes da compactação, então
+    refazer este passo depois de uma queda não duplica (nem corta) registros.
+    """
+    registros = ler_diario(arquivo, separado)
+    with open(caminho_historico(arquivo), "a+b") as f:
+        f.truncate(tamanho_historico)
+        f.writelines(
+            (json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8") for r in registros
+        )
+        f.flush()
+        os.fsync(f.fileno())
+    os.remove(separado)
+
+
+def _separados(arquivo):
+    """Diários postos de lado por uma compactação interrompida: [(caminho, tamanho do histórico)]"""
+    base = caminho_compactando(arquivo, "*")
+    prefixo, _, sufixo = base.rpartition("*")
+    encontrados = []
+    for caminho in glob.glob(glob.escape(prefixo) + "*" + glob.escape(sufixo)):
+        try:
+            encontrados.append((caminho, int(caminho[len(prefixo) : -len(sufixo)])))
+        except ValueError:
+            continue
+    return sorted(encontrados, key=lambda item: item[1])
+
+
+def compactar(arquivo=ARQUIVO_MAPEAMENTO):
+    """
+    Incorpora o diário ao snapshot
+
+    O snapshot novo é gravado com troca atômica antes de o diário sair do
+    lugar; se algo cair entre os dois passos, reaplicar o diário sobre o
+    snapshot novo dá o mesmo resultado. Depois o diário é renomeado (troca
+    atômica) para um arquivo que guarda o tamanho do histórico, suas linhas
+    vão para o histórico de auditoria e ele é apagado: uma compactação
+    interrompida é concluída na próxima sem repetir registros no histórico.
+    Com escritores concorrentes, chame dentro da trava do ArmazemCargos.
+    """
+    for separado, tamanho_historico in _separados(arquivo):
+        _arquivar(arquivo, separado, tamanho_historico)
+
+    caminho = caminho_diario(arquivo)
+    if not os.path.exists(caminho):
+        return 0
+    registros = ler_diario(arquivo)
+    mapeamento = carregar_mapeamento(arquivo)
+    _gravar_atomico(arquivo, json.dumps(mapeamento, ensure_ascii=False, indent=4))
+    versoes = [r["versao"] for r in registros if "versao" in r]
+    if versoes:
+        _gravar_atomico(caminho_versao(arquivo), str(max(versoes)))
+
+    historico = caminho_historico(arquivo)
+    tamanho_historico = os.path.getsize(historico) if os.path.exists(historico) else 0
+    separado = caminho_compactando(arquivo, tamanho_historico)
+    os.replace(caminho, separado)
+    _arquivar(arquivo, separado, tamanho_historico)
+    return len(registros)
+
+
+def _ultimas_linhas(caminho, quantidade, bloco=64 * 1024):
+    """Últimas linhas de um arquivo, lendo de trás para frente só o necessário"""
+    with open(caminho, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        posicao, dados = f.tell(), b""
+        while posicao > 0 and dados.count(b"\n") <= quantidade:
+            passo = min(bloco, posicao)
+            posicao -= passo
+            f.seek(posicao)
+            dados = f.read(passo) + dados
+    linhas = dados.splitlines()
+    if posicao > 0:
+        linhas = linhas[1:]  # a primeira pode ter começado antes do trecho lido
+    return linhas[-quantidade:]
+
+
+def ler_historico(arquivo=ARQUIVO_MAPEAMENTO, ultimos=None):
+    """
+    Reclassificações registradas (já compactadas e pendentes), da mais antiga à mais nova
+
+    Args:
+        arquivo: Snapshot JSON ao qual o histórico pertence
+        ultimos: Só as N mais recentes, lendo apenas o fim do histórico (None = todas)
+    """
+    # Diário pendente (limitado pela compactação), depois de um eventual posto de lado
+    # por uma compactação interrompida, que ainda não chegou ao histórico
+    pendentes = [r for c, _ in _separados(arquivo) for r in ler_diario(arquivo, c)]
+    pendentes += ler_diario(arquivo)
+    if ultimos is not None and len(pendentes) >= ultimos:
+        return pendentes[len(pendentes) - ultimos :]
+
+    caminho = caminho_historico(arquivo)
+    if not os.path.exists(caminho):
+        return pendentes
+    if ultimos is None:
+        with open(caminho, "rb") as f:
+            linhas = f.read().splitlines()
+    else:
+        linhas = _ultimas_linhas(caminho, ultimos - len(pendentes))
+    historico = []
+    for linha in linhas:
+        try:
+            historico.append(json.loads(linha))
+        except ValueError:
+            continue
+    return historico + pendentes
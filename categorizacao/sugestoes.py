@@ -0,0 +1,116 @@
+"""
+Sugestão de categoria para os cargos não classificados
+
+Cada cargo pendente é comparado, pelo índice de trigramas, com os cargos já
+classificados. Os vizinhos mais parecidos votam na própria categoria com peso
+igual à similaridade; vizinhos com a mesma primeira palavra (ANALISTA,
+COORDENADOR, ...) ganham um bônus, porque é ela que costuma definir a
+categoria. A confiança é a fração do voto da categoria vencedora vezes a
+similaridade do melhor vizinho dela: alta só quando os vizinhos concordam e
+são de fato parecidos.
+
+Cargos com palavras de CLASSIFICACAO_MANUAL (AUTONOMO, IMPLANTACAO) nunca
+recebem sugestão: são ambíguos de propósito e ficam para alguém decidir.
+"""
+
+from collections import Counter
+
+NAO_CLASSIFICADO = "Não Classificado"
+
+# Palavras (já normalizadas) dos cargos que só se classificam à mão; as regras
+# de temp/categorize_cargos.py também os deixam como "Não Classificado"
+CLASSIFICACAO_MANUAL = ("AUTONOMO", "IMPLANTACAO")
+
+# Vizinhos classificados que votam em cada sugestão
+VIZINHOS = 3
+
+# Similaridade mínima para um cargo classificado contar como vizinho
+SIMILARIDADE_VIZINHO = 0.2
+
+# Quanto do que falta para 1 a similaridade ganha quando a primeira palavra é a mesma
+BONUS_PRIMEIRA_PALAVRA = 0.5
+
+# Confiança padrão para aceitar sugestões em lote
+CONFIANCA_MINIMA = 0.6
+
+
+def _primeira_palavra(chave):
+    partes = chave.split(maxsplit=1)
+    return partes[0] if partes else ""
+
+
+def classificacao_manual(chave):
+    """Se o cargo (texto normalizado) fica fora das sugestões automáticas"""
+    return any(palavra in chave for palavra in CLASSIFICACAO_MANUAL)
+
+
+def sugerir_categoria(indice, i, classificados, categoria_de, vizinhos=VIZINHOS):
+    """
+    Sugestão para um cargo do índice
+
+    Args:
+        indice: IndiceTrigramas com todos os cargos
+        i: Id (posição no índice) do cargo
+        classificados: Conjunto de ids dos cargos já classificados
+        categoria_de: Função id -> categoria
+        vizinhos: Quantos vizinhos votam
+
+    Returns:
+        Tupla (categoria, confiança, vizinho mais parecido) ou None sem vizinhos
+    """
+    chave = indice.chaves[i]
+    primeira = _primeira_palavra(chave)
+    similares = []
+    for j, similaridade in indice.similares(chave, classificados, SIMILARIDADE_VIZINHO):
+        if j == i:
+            continue
+        if primeira and _primeira_palavra(indice.chaves[j]) == primeira:
+            similaridade += (1 - similaridade) * BONUS_PRIMEIRA_PALAVRA
+        similares.append((similaridade, j))
+    if not similares:
+        return None
+
+    similares.sort(key=lambda item: (-item[0], indice.chaves[item[1]]))
+    votos, melhor = Counter(), {}
+    for similaridade, j in similares[:vizinhos]:
+        categoria = categoria_de(j)
+        votos[categoria] += similaridade
+        melhor.setdefault(categoria, (similaridade, j))
+    categoria, peso = votos.most_common(1)[0]
+    similaridade, j = melhor[categoria]
+    confianca = peso / sum(votos.values()) * similaridade
+    return categoria, confianca, indice.nomes[j]
+
+
+def sugerir(indice, mapeamento, vizinhos=VIZINHOS):
+    """
+    Sugestões para todos os cargos "Não Classificado" de uma vez
+
+    Os de classificação manual (ver CLASSIFICACAO_MANUAL) ficam de fora.
+
+    Args:
+        indice: IndiceTrigramas com os cargos do mapeamento
+        mapeamento: Dicionário cargo -> categoria atual
+        vizinhos: Quantos vizinhos votam em cada sugestão
+
+    Returns:
+        Lista de (cargo, categoria sugerida, confiança, vizinho mais parecido),
+        da maior para a menor confiança
+    """
+    classificados, pendentes = set(), []
+    for i, cargo in enumerate(indice.nomes):
+        if mapeamento.get(cargo, NAO_CLASSIFICADO) == NAO_CLASSIFICADO:
+            if not classificacao_manual(indice.chaves[i]):
+                pendentes.append(i)
+        else:
+            classificados.add(i)
+
+    categoria_de = lambda j: mapeamento[indice.nomes[j]]
+    sugestoes = []
+    for i in pendentes:
+        sugestao = sugerir_categoria(indice, i, classificados, categoria_de, vizinhos)
+        if sugestao is not None:
+            categoria, confianca, vizinho = sugestao
+            sugestoes.append((indice.nomes[i], categoria, confianca, vizinho))
+    sugestoes.sort(key=lambda s: (-s[2], s[0]))
+    return sugestoes
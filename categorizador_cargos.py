@@ -1,8 +1,15 @@
 import streamlit as st
+import io
+import csv
 import json
+import hashlib
+from collections import Counter
 import pandas as pd
 from datetime import datetime
 
+from categorizacao import CLASSIFICACAO_MANUAL, CONFIANCA_MINIMA, ArmazemCargos, IndiceTrigramas, ler_historico, sugerir
+from dados import assinatura_arquivo, carregar_oris, localizar_fonte, normalizar_serie, normalizar_texto
+
 # Configuração da página
 st.set_page_config(
     page_title="Categorizador de Cargos - SBCD", page_icon="📋", layout="wide"
@@ -26,6 +33,12 @@ CATEGORIAS = [
     "AUTONOMO",
 ]
 
+# Reclassificações mostradas no histórico
+HISTORICO_EXIBIDO = 200
+
+# Opções de tamanho da página da grade de edição
+ITENS_POR_PAGINA = [25, 50, 100, 200]
+
 # CSS customizado com cores SBCD
 st.markdown(
     """
@@ -66,49 +79,253 @@ st.markdown(
 
 
 # Funções auxiliares
+@st.cache_resource
+def obter_armazem():
+    """Mapeamento versionado compartilhado por todas as sessões do servidor"""
+    return ArmazemCargos("cargos_niveis.json")
+
+
 def carregar_cargos():
-    """Carrega o arquivo JSON de cargos"""
+    """Copia o mapeamento atual para a sessão, guardando a versão lida"""
     try:
-        with open("cargos_niveis.json", "r", encoding="utf-8") as f:
-            return json.load(f)
+        armazem = obter_armazem()
     except FileNotFoundError:
         st.error("❌ Arquivo 'cargos_niveis.json' não encontrado!")
         return {}
+    cargos, st.session_state.versao, st.session_state.geracao = armazem.copia()
+    return cargos
 
 
-def salvar_cargos(cargos_dict):
-    """Salva as alterações no arquivo JSON"""
-    with open("cargos_niveis.json", "w", encoding="utf-8") as f:
-        json.dump(cargos_dict, f, ensure_ascii=False, indent=4)
+def acompanhar_remotas():
+    """
+    Lê o que outras pessoas salvaram desde a última leitura da sessão
+
+    Só os cargos que chegaram no diário são considerados; os que esta sessão
+    alterou e ainda não salvou são mantidos (o conflito aparece ao salvar).
+
+    Returns:
+        {cargo: categoria} a aplicar na sessão com definir_categoria
+    """
+    if "versao" not in st.session_state:
+        return {}
+    armazem = obter_armazem()
+    mudancas, versao, geracao = armazem.mudancas_desde(
+        st.session_state.versao, st.session_state.geracao
+    )
+    salvo, cargos = st.session_state.cargos_salvos, st.session_state.cargos
+    if mudancas is None:
+        # Compactação ou JSON regravado: compara com o mapeamento inteiro
+        atual, versao, geracao = armazem.copia()
+        mudancas = {c: v for c, v in atual.items() if salvo.get(c) != v}
+        novos = atual.keys() != cargos.keys()
+    else:
+        # Cargos acrescentados pelo diário (ex.: extract_cargos.py) também mudam as chaves
+        novos = any(c not in cargos for c in mudancas)
+        if novos:
+            atual, versao, geracao = armazem.copia()
+    if novos:
+        # Cargos novos ou removidos: recomeça a sessão mantendo as edições locais
+        locais = {c: v for c, v in cargos.items() if c in atual and salvo.get(c) != v}
+        st.session_state.cargos_salvos = atual
+        st.session_state.cargos = {**atual, **locais}
+        for chave in ("assinatura_nomes", "por_categoria"):
+            st.session_state.pop(chave, None)
+        st.session_state.versao, st.session_state.geracao = versao, geracao
+        return {}
+
+    aplicar = {}
+    for cargo, categoria in mudancas.items():
+        if cargos.get(cargo) != salvo.get(cargo):
+            continue  # editado aqui e ainda não salvo: o conflito aparece ao salvar
+        salvo[cargo] = categoria
+        if cargos.get(cargo) != categoria:
+            aplicar[cargo] = categoria
+    st.session_state.versao, st.session_state.geracao = versao, geracao
+    return aplicar
 
 
-def calcular_progresso(cargos_dict):
-    """Calcula o progresso da categorização"""
-    total = len(cargos_dict)
-    classificados = sum(1 for v in cargos_dict.values() if v != "Não Classificado")
+def salvar_cargos(cargos_dict):
+    """
+    Envia só os cargos alterados, com a categoria que a sessão tinha visto
+
+    Returns:
+        Tupla (quantidade gravada, conflitos [(cargo, vista, sua, atual)])
+    """
+    salvo = st.session_state.cargos_salvos
+    alteracoes = {
+        cargo: (salvo.get(cargo), categoria)
+        for cargo, categoria in cargos_dict.items()
+        if salvo.get(cargo) != categoria
+    }
+    gravadas, conflitos = obter_armazem().salvar(alteracoes)
+    salvo.update({cargo: nova for cargo, _, nova in gravadas})
+    # Nos cargos resolvidos sem gravar (alguém já tinha posto o mesmo valor) a sessão fica em dia
+    em_conflito = {c for c, _, _, _ in conflitos}
+    salvo.update({c: n for c, (_, n) in alteracoes.items() if c not in em_conflito})
+    st.session_state.conflitos = {c: (vista, sua, atual) for c, vista, sua, atual in conflitos}
+    return len(gravadas), conflitos
+
+
+def calcular_progresso(contagem):
+    """Calcula o progresso da categorização a partir da contagem por categoria"""
+    total = sum(contagem.values())
+    classificados = total - contagem["Não Classificado"]
     percentual = (classificados / total * 100) if total > 0 else 0
     return classificados, total, percentual
 
 
+@st.cache_resource
+def obter_indice_busca(assinatura, _nomes):
+    """Índice de trigramas dos nomes de cargo (um por conjunto de nomes, compartilhado entre sessões)"""
+    return IndiceTrigramas(_nomes)
+
+
+def assinatura_nomes(cargos_dict):
+    return hashlib.sha1("\n".join(cargos_dict).encode("utf-8")).hexdigest()
+
+
+def agrupar_por_categoria(cargos_dict, indice):
+    """Conjunto de ids do índice por categoria, para combinar filtro e busca sem varrer tudo"""
+    grupos = {}
+    for cargo, categoria in cargos_dict.items():
+        grupos.setdefault(categoria, set()).add(indice.posicao[cargo])
+    return grupos
+
+
+def definir_categoria(cargo, nova_categoria):
+    """Altera a categoria de um cargo na sessão, mantendo os conjuntos por categoria"""
+    antiga = st.session_state.cargos[cargo]
+    if antiga == nova_categoria:
+        return
+    st.session_state.cargos[cargo] = nova_categoria
+    st.session_state.contagem[antiga] -= 1
+    st.session_state.contagem[nova_categoria] += 1
+    i = indice.posicao[cargo]
+    st.session_state.por_categoria.get(antiga, set()).discard(i)
+    st.session_state.por_categoria.setdefault(nova_categoria, set()).add(i)
+    st.session_state.revisao += 1
+
+
 def exportar_csv(cargos_dict):
     """Exporta para CSV"""
-    df = pd.DataFrame(list(cargos_dict.items()), columns=["Cargo", "Categoria"])
-    return df.to_csv(index=False).encode("utf-8")
+    saida = io.StringIO()
+    escritor = csv.writer(saida)
+    escritor.writerow(["Cargo", "Categoria"])
+    escritor.writerows(cargos_dict.items())
+    return saida.getvalue().encode("utf-8")
+
+
+@st.cache_data(show_spinner="Contando colaboradores por cargo...")
+def contar_colaboradores(versao_oris):
+    """
+    Colaboradores por cargo (chave normalizada) no oris
+
+    versao_oris (fonte + tamanho/data do arquivo) só serve de chave do cache:
+    a contagem é refeita quando o oris muda, não quando o mapeamento muda.
+
+    Returns:
+        Dicionário {cargo normalizado: (total, ativos)}
+    """
+    df = carregar_oris(colunas=["Cargo", "Dt Rescisão"])
+    chaves = normalizar_serie(df["Cargo"].fillna("").astype(str))
+    contagem = pd.DataFrame({"Total": 1, "Ativos": df["Dt Rescisão"].isna()}).groupby(chaves.values).sum()
+    return {chave: (int(t), int(a)) for chave, t, a in contagem.itertuples()}
+
+
+def exportar_colaboradores(cargos_dict, contagens):
+    """CSV cargo -> categoria -> colaboradores, escrito linha a linha sem montar DataFrame"""
+    saida = io.StringIO()
+    escritor = csv.writer(saida)
+    escritor.writerow(["Cargo", "Categoria", "Colaboradores", "Ativos"])
+    for cargo, categoria in cargos_dict.items():
+        escritor.writerow([cargo, categoria, *contagens.get(normalizar_texto(cargo), (0, 0))])
+    return saida.getvalue().encode("utf-8")
+
+
+def versao_oris():
+    tipo, caminho = localizar_fonte("oris")
+    return tipo, caminho, assinatura_arquivo(caminho)
+
+
+def versao_mapeamento():
+    return st.session_state.get("geracao"), st.session_state.get("versao"), st.session_state.revisao
+
+
+def obter_sugestoes():
+    """Sugestões para todos os pendentes, recalculadas só quando o mapeamento muda"""
+    versao, sugestoes = st.session_state.get("sugestoes", (None, None))
+    if versao != versao_mapeamento():
+        sugestoes = sugerir(indice, st.session_state.cargos)
+        st.session_state.sugestoes = (versao_mapeamento(), sugestoes)
+    return sugestoes
+
+
+def exportacao_pronta(tipo):
+    cache = st.session_state.exportacoes
+    return tipo in cache and cache.get("versao") == versao_mapeamento()
+
+
+def obter_exportacao(tipo):
+    """
+    Gera a exportação só quando pedida e guarda para a versão atual do mapeamento
+
+    A versão (versao_mapeamento) é (geração, versão do armazém, revisão local): qualquer edição,
+    mudança remota ou recarga invalida o que foi gerado antes.
+    """
+    versao = versao_mapeamento()
+    cache = st.session_state.exportacoes
+    if cache.get("versao") != versao:
+        cache.clear()
+        cache["versao"] = versao
+    if tipo not in cache:
+        cargos_dict = st.session_state.cargos
+        if tipo == "csv":
+            cache[tipo] = exportar_csv(cargos_dict)
+        elif tipo == "json":
+            cache[tipo] = json.dumps(cargos_dict, ensure_ascii=False, indent=4).encode("utf-8")
+        else:
+            cache[tipo] = exportar_colaboradores(cargos_dict, contar_colaboradores(versao_oris()))
+    return cache[tipo]
 
 
 # Inicialização do estado da sessão
 if "cargos" not in st.session_state:
     st.session_state.cargos = carregar_cargos()
+    st.session_state.cargos_salvos = dict(st.session_state.cargos)
+if "conflitos" not in st.session_state:
+    st.session_state.conflitos = {}
+if "grade_versao" not in st.session_state:
+    st.session_state.grade_versao = 0
+if "revisao" not in st.session_state:
+    st.session_state.revisao = 0  # sobe a cada edição da sessão; versiona as exportações
+    st.session_state.exportacoes = {}
+remotas = acompanhar_remotas()
 if "filtro_categoria" not in st.session_state:
     st.session_state.filtro_categoria = "Não Classificado"
 if "busca" not in st.session_state:
     st.session_state.busca = ""
+if "assinatura_nomes" not in st.session_state:
+    st.session_state.assinatura_nomes = assinatura_nomes(st.session_state.cargos)
+
+indice = obter_indice_busca(
+    st.session_state.assinatura_nomes, list(st.session_state.cargos)
+)
+if "por_categoria" not in st.session_state:
+    st.session_state.por_categoria = agrupar_por_categoria(st.session_state.cargos, indice)
+    # Contagem por categoria: montada só aqui, depois ajustada a cada edição
+    st.session_state.contagem = Counter(st.session_state.cargos.values())
+for cargo, categoria in remotas.items():
+    definir_categoria(cargo, categoria)
+if remotas:
+    # A grade guarda edições por posição de linha; recomeça para não aplicá-las à linha errada
+    st.session_state.grade_versao += 1
+    st.toast(f"🔄 {len(remotas)} cargos atualizados por outras sessões")
 
 # Interface principal
 st.title("📋 Categorizador de Cargos - SBCD")
 
 # Barra de progresso
-classificados, total, percentual = calcular_progresso(st.session_state.cargos)
+classificados, total, percentual = calcular_progresso(st.session_state.contagem)
 st.markdown(
     f"""
 <div class="progress-bar">
@@ -136,143 +353,198 @@ with col3:
     st.write("")
     st.write("")
     if st.button("💾 Salvar Alterações"):
-        salvar_cargos(st.session_state.cargos)
-        st.success("✅ Salvo com sucesso!")
-
-# Botões de exportação
-col_exp1, col_exp2, col_exp3 = st.columns([1, 1, 3])
-with col_exp1:
-    csv = exportar_csv(st.session_state.cargos)
-    st.download_button(
-        "📥 Exportar CSV",
-        csv,
-        f"cargos_categorizados_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-        "text/csv",
-    )
-
-with col_exp2:
-    json_str = json.dumps(st.session_state.cargos, ensure_ascii=False, indent=4)
-    st.download_button(
-        "📥 Exportar JSON",
-        json_str,
-        f"cargos_categorizados_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-        "application/json",
-    )
+        n, conflitos = salvar_cargos(st.session_state.cargos)
+        if conflitos:
+            st.warning(
+                f"⚠️ {len(conflitos)} cargos não foram salvos: foram alterados por outra pessoa "
+                "(veja os conflitos abaixo)"
+            )
+        if n:
+            st.success(f"✅ {n} alterações salvas")
+        elif not conflitos:
+            st.info("Nenhuma alteração para salvar")
+
+# Conflitos do último salvamento: a mesma linha mudou aqui e em outra sessão
+if st.session_state.conflitos:
+    with st.expander(f"⚠️ Conflitos ({len(st.session_state.conflitos)})", expanded=True):
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    (c, v, s, "(removido)" if a is None else a)
+                    for c, (v, s, a) in st.session_state.conflitos.items()
+                ],
+                columns=["Cargo", "Você viu", "Sua categoria", "Categoria atual"],
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+        col_c1, col_c2 = st.columns(2)
+        with col_c1:
+            if st.button("↩️ Usar a categoria atual"):
+                for cargo, (_, _, atual) in st.session_state.conflitos.items():
+                    if atual is None:
+                        # Removido por outra sessão: não há categoria a adotar, só para de enviá-lo
+                        st.session_state.cargos_salvos[cargo] = st.session_state.cargos[cargo]
+                        continue
+                    st.session_state.cargos_salvos[cargo] = atual
+                    definir_categoria(cargo, atual)
+                st.session_state.conflitos = {}
+                st.session_state.grade_versao += 1
+                st.rerun()
+        with col_c2:
+            if st.button("✍️ Manter as minhas"):
+                # Agora a sessão "viu" a categoria atual: o próximo salvamento sobrescreve
+                for cargo, (_, _, atual) in st.session_state.conflitos.items():
+                    st.session_state.cargos_salvos[cargo] = atual
+                salvar_cargos(st.session_state.cargos)
+                st.rerun()
+
+# Exportações: geradas só quando pedidas e guardadas até a próxima alteração
+FORMATOS_EXPORTACAO = {
+    "csv": ("CSV", "cargos_categorizados", "csv", "text/csv"),
+    "json": ("JSON", "cargos_categorizados", "json", "application/json"),
+    "colaboradores": ("cargos + colaboradores", "cargos_colaboradores", "csv", "text/csv"),
+}
+colunas_exportacao = st.columns([1, 1, 1, 2])
+for coluna, (tipo, (nome, prefixo, extensao, mime)) in zip(colunas_exportacao, FORMATOS_EXPORTACAO.items()):
+    with coluna:
+        if exportacao_pronta(tipo):
+            st.download_button(
+                f"📥 Exportar {nome}",
+                st.session_state.exportacoes[tipo],
+                f"{prefixo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extensao}",
+                mime,
+                key=f"baixar_{tipo}",
+            )
+        elif st.button(f"⚙️ Gerar {nome}", key=f"gerar_{tipo}"):
+            try:
+                obter_exportacao(tipo)
+            except FileNotFoundError as e:
+                st.error(f"❌ {e}")
+            else:
+                st.rerun()
 
 st.divider()
 
-# Filtrar cargos
-cargos_filtrados = {}
-for cargo, categoria in st.session_state.cargos.items():
-    # Filtro por categoria
-    if filtro != "Todos" and categoria != filtro:
-        continue
-
-    # Filtro por busca
-    if busca and busca.lower() not in cargo.lower():
-        continue
-
-    cargos_filtrados[cargo] = categoria
+# Filtrar cargos (categoria pelos conjuntos pré-calculados, busca pelo índice de trigramas)
+ids_categoria = None if filtro == "Todos" else st.session_state.por_categoria.get(filtro, set())
+if busca:
+    nomes_filtrados = indice.buscar(busca, candidatos=ids_categoria)
+elif ids_categoria is None:
+    nomes_filtrados = indice.nomes
+else:
+    nomes_filtrados = [indice.nomes[i] for i in sorted(ids_categoria)]
 
 # Mostrar quantidade de resultados
-st.info(f"📊 Mostrando {len(cargos_filtrados)} de {total} cargos")
+st.info(f"📊 Mostrando {len(nomes_filtrados)} de {total} cargos")
 
-# Listagem de cargos
-if len(cargos_filtrados) == 0:
+# Listagem de cargos: uma única grade editável, só com as linhas da página atual
+if len(nomes_filtrados) == 0:
     st.warning("Nenhum cargo encontrado com os filtros aplicados.")
 else:
-    # Modo de visualização
-    modo = st.radio(
-        "Modo de visualização:",
-        ["📝 Edição Individual", "⚡ Edição Rápida"],
-        horizontal=True,
+    col_pag1, col_pag2 = st.columns([1, 3])
+    with col_pag1:
+        itens_por_pagina = st.selectbox("Cargos por página:", ITENS_POR_PAGINA, index=1)
+    total_paginas = (len(nomes_filtrados) + itens_por_pagina - 1) // itens_por_pagina
+    with col_pag2:
+        pagina = st.number_input(
+            f"Página (de {total_paginas}):", min_value=1, max_value=total_paginas, value=1
+        )
+    inicio = (pagina - 1) * itens_por_pagina
+    cargos_pagina = nomes_filtrados[inicio : inicio + itens_por_pagina]
+
+    df_pagina = pd.DataFrame(
+        {
+            "Selecionar": False,
+            "Cargo": cargos_pagina,
+            "Categoria": [st.session_state.cargos[c] for c in cargos_pagina],
+        }
+    )
+    # A chave muda a cada aplicação: as posições das linhas editadas só valem para esta página
+    chave_grade = f"grade_{st.session_state.grade_versao}_{filtro}_{busca}_{itens_por_pagina}_{pagina}"
+    df_editado = st.data_editor(
+        df_pagina,
+        key=chave_grade,
+        hide_index=True,
+        use_container_width=True,
+        disabled=["Cargo"],
+        column_config={
+            "Selecionar": st.column_config.CheckboxColumn("✔", width="small"),
+            "Categoria": st.column_config.SelectboxColumn(
+                "Categoria", options=CATEGORIAS, required=True
+            ),
+        },
     )
 
-    if modo == "📝 Edição Individual":
-        # Modo individual - mais detalhado
-        for cargo, categoria_atual in cargos_filtrados.items():
-            with st.container():
-                st.markdown(
-                    f"""
-                <div class="cargo-card">
-                    <h3>{cargo}</h3>
-                </div>
-                """,
-                    unsafe_allow_html=True,
-                )
-
-                col_a, col_b = st.columns([3, 1])
-                with col_a:
-                    nova_categoria = st.selectbox(
-                        "Categoria:",
-                        CATEGORIAS,
-                        index=CATEGORIAS.index(categoria_atual),
-                        key=f"select_{cargo}",
-                        label_visibility="collapsed",
-                    )
-
-                with col_b:
-                    if st.button("✅ Atualizar", key=f"btn_{cargo}"):
-                        st.session_state.cargos[cargo] = nova_categoria
-                        st.rerun()
-
-                st.markdown("---")
+    # Categorias editadas na grade valem na hora; a seleção fica para a ação em lote
+    edicoes = {
+        cargo: categoria
+        for cargo, categoria in zip(df_editado["Cargo"], df_editado["Categoria"])
+        if categoria != st.session_state.cargos[cargo]
+    }
+    selecionados = df_editado.loc[df_editado["Selecionar"], "Cargo"].tolist()
 
-    else:
-        # Modo rápido - tabela editável
-        st.info(
-            "💡 Dica: Edite diretamente na tabela e clique em 'Salvar Alterações' no topo da página"
+    col_lote1, col_lote2 = st.columns([3, 1])
+    with col_lote1:
+        categoria_lote = st.selectbox(
+            f"Categoria para a seleção ({len(selecionados)} cargos):", CATEGORIAS
         )
+    with col_lote2:
+        st.write("")
+        st.write("")
+        if st.button("⚡ Definir para a seleção", disabled=not selecionados):
+            edicoes.update(dict.fromkeys(selecionados, categoria_lote))
+
+    if edicoes:
+        # Tudo entra numa única atualização; a grade recomeça porque as linhas da página mudam
+        for cargo, categoria in edicoes.items():
+            definir_categoria(cargo, categoria)
+        st.session_state.grade_versao += 1
+        st.rerun()
+
+    st.caption(
+        "💡 Edite a coluna Categoria ou marque linhas e use a ação em lote; depois clique em "
+        "'Salvar Alterações' no topo da página"
+    )
 
-        cargos_list = list(cargos_filtrados.keys())
-        categorias_list = [cargos_filtrados[c] for c in cargos_list]
-
-        # Criar DataFrame editável
-        df_edicao = pd.DataFrame(
-            {"Cargo": cargos_list, "Categoria Atual": categorias_list}
+# Sugestões automáticas pelos cargos classificados mais parecidos
+if st.session_state.contagem["Não Classificado"]:
+    with st.expander("🤖 Sugestões automáticas"):
+        confianca_minima = st.slider(
+            "Confiança mínima:", 0.0, 1.0, CONFIANCA_MINIMA, 0.05
         )
-
-        # Mostrar em batches de 50 para performance
-        itens_por_pagina = 50
-        total_paginas = (len(cargos_list) + itens_por_pagina - 1) // itens_por_pagina
-
-        if total_paginas > 1:
-            pagina = st.selectbox(
-                "Página:",
-                range(1, total_paginas + 1),
-                format_func=lambda x: f"Página {x} de {total_paginas}",
-            )
-            inicio = (pagina - 1) * itens_por_pagina
-            fim = min(inicio + itens_por_pagina, len(cargos_list))
-            cargos_pagina = cargos_list[inicio:fim]
-        else:
-            cargos_pagina = cargos_list
-
-        # Edição rápida com selectbox para cada cargo
-        for cargo in cargos_pagina:
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                st.text(cargo)
-            with col2:
-                nova_cat = st.selectbox(
-                    "Cat",
-                    CATEGORIAS,
-                    index=CATEGORIAS.index(st.session_state.cargos[cargo]),
-                    key=f"quick_{cargo}",
-                    label_visibility="collapsed",
-                )
-                if nova_cat != st.session_state.cargos[cargo]:
-                    st.session_state.cargos[cargo] = nova_cat
+        st.caption(
+            "Cargos com " + ", ".join(CLASSIFICACAO_MANUAL)
+            + " não recebem sugestão: ficam para classificação manual."
+        )
+        sugestoes = obter_sugestoes()
+        aceitas = [s for s in sugestoes if s[2] >= confianca_minima]
+        st.dataframe(
+            pd.DataFrame(
+                sugestoes, columns=["Cargo", "Sugestão", "Confiança", "Mais parecido com"]
+            ),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Confiança": st.column_config.ProgressColumn(
+                    "Confiança", min_value=0.0, max_value=1.0, format="%.2f"
+                ),
+            },
+        )
+        if st.button(
+            f"✅ Aceitar as {len(aceitas)} sugestões com confiança ≥ {confianca_minima:.0%}",
+            disabled=not aceitas,
+        ):
+            for cargo, categoria, _, _ in aceitas:
+                definir_categoria(cargo, categoria)
+            st.session_state.grade_versao += 1
+            st.rerun()
 
 # Estatísticas por categoria
 st.divider()
 st.subheader("📊 Estatísticas por Categoria")
 
-stats = {}
-for categoria in CATEGORIAS:
-    stats[categoria] = sum(
-        1 for v in st.session_state.cargos.values() if v == categoria
-    )
+stats = {categoria: st.session_state.contagem[categoria] for categoria in CATEGORIAS}
 
 df_stats = pd.DataFrame(list(stats.items()), columns=["Categoria", "Quantidade"])
 df_stats = df_stats.sort_values("Quantidade", ascending=False)
@@ -284,6 +556,23 @@ with col_stat1:
 with col_stat2:
     st.bar_chart(df_stats.set_index("Categoria"))
 
+# Histórico de reclassificações (diário + compactados)
+with st.expander("🕘 Histórico de reclassificações"):
+    # Lido só a pedido, e só o fim do arquivo: o histórico cresce sem limite
+    if st.toggle("Mostrar as 200 mais recentes", key="mostrar_historico"):
+        historico = ler_historico("cargos_niveis.json", ultimos=HISTORICO_EXIBIDO)
+    else:
+        historico = None
+    if historico is None:
+        st.caption("Ative para carregar o histórico.")
+    elif historico:
+        df_hist = pd.DataFrame(historico[::-1]).rename(
+            columns={"cargo": "Cargo", "de": "De", "para": "Para", "em": "Quando"}
+        )
+        st.dataframe(df_hist, hide_index=True, use_container_width=True)
+    else:
+        st.write("Nenhuma reclassificação registrada ainda.")
+
 # Rodapé
 st.divider()
 st.caption(
@@ -0,0 +1,44 @@
+"""
+Camada única de acesso aos dados do dashboard (oris e Base_Bi)
+
+Uso:
+    from dados import carregar_oris, carregar_base_bi
+    df = carregar_oris()                      # fonte padrão (DASH_FONTE, senão xlsx)
+    df = carregar_oris(fonte="sqlite")        # força o oris.db
+    df = carregar_oris(colunas=["Cargo"])     # lê só as colunas pedidas
+
+    from dados import DatasetAoVivo
+    oris = DatasetAoVivo("oris", processar=minha_funcao)
+    df = oris.obter()                         # versão anterior enquanto a nova é processada
+"""
+
+from .atualizacao import DatasetAoVivo, hash_arquivo, versao_fonte
+from .cabecalho import detectar_cabecalho
+from .colunas import (
+    COLUNAS_BASE_BI,
+    COLUNAS_DATA_BASE_BI,
+    COLUNAS_DATA_ORIS,
+    COLUNAS_ORIS,
+    chave_coluna,
+    nome_canonico,
+    normalizar_colunas,
+)
+from .excel import ler_blocos
+from .fontes import (
+    DATASETS,
+    DIRETORIO_CACHE,
+    DIRETORIO_DADOS,
+    FONTE_PADRAO,
+    assinatura_arquivo,
+    caminho_dados,
+    carregar_base_bi,
+    carregar_dataset,
+    carregar_oris,
+    converter_data,
+    ler_fonte,
+    ler_planilha,
+    limpar_cache,
+    localizar_fonte,
+    resolver_cabecalho,
+)
+from .texto import normalizar_serie, normalizar_texto
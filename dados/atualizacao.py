@@ -0,0 +1,166 @@
+"""Datasets processados mantidos em memória e renovados em segundo plano"""
+
+import hashlib
+import os
+import threading
+import time
+
+from .fontes import assinatura_arquivo, carregar_dataset, localizar_fonte
+
+TAMANHO_LEITURA_HASH = 1024 * 1024
+
+
+def versao_fonte(dataset, fonte=None):
+    """Versão barata da fonte atual: (tipo, caminho, tamanho, data de modificação)"""
+    tipo, caminho = localizar_fonte(dataset, fonte)
+    return (tipo, caminho) + assinatura_arquivo(caminho)
+
+
+def hash_arquivo(caminho):
+    """SHA-1 do conteúdo (só calculado quando tamanho/data mudam)"""
+    h = hashlib.sha1()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(TAMANHO_LEITURA_HASH), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class DatasetAoVivo:
+    """
+    Versão processada de um dataset, trocada quando a fonte muda
+
+    A cada obter() só a versão da fonte é conferida (um os.stat). Se mudou,
+    uma thread confere o hash do conteúdo (cópia idêntica não reprocessa),
+    carrega e processa a nova versão enquanto as sessões continuam recebendo
+    a anterior; a troca é uma única atribuição sob trava. Uma versão que
+    falhou (ex.: arquivo ainda sendo copiado) só é tentada de novo quando o
+    arquivo mudar outra vez. `etapa`/`progresso` descrevem a carga em
+    andamento, para a interface mostrar enquanto espera.
+    """
+
+    def __init__(self, dataset, processar=None, fonte=None):
+        """
+        Args:
+            dataset: Nome do dataset ("oris" ou "base_bi")
+            processar: Função DataFrame -> DataFrame aplicada depois da carga
+                (roda fora da thread do Streamlit: não deve chamar st.*)
+            fonte: "xlsx", "sqlite", "parquet" ou "auto"
+        """
+        self.dataset = dataset
+        self.processar = processar
+        self.fonte = fonte
+        self.versao = None  # versão da fonte do DataFrame atual
+        self.hash = None
+        self.carregado_em = None
+        self.erro = None  # última falha de atualização (o DataFrame anterior segue valendo)
+        self.etapa = None  # descrição da etapa da carga em andamento
+        self.progresso = 0.0
+        self.inicio = None  # time.time() do começo da carga em andamento
+        self.duracao = None  # quanto levou a última carga completa
+        self._df = None
+        self._falhou = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._lock_inicial = threading.Lock()
+
+    @property
+    def atualizando(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def andamento(self):
+        """
+        Etapa e fração estimada da carga em segundo plano (None, 1.0 se não há nenhuma)
+
+        A fração avança pelo tempo quando se sabe quanto levou a carga anterior;
+        na primeira carga só as etapas contam.
+        """
+        if not self.atualizando:
+            return None, 1.0
+        fracao = self.progresso
+        if self.duracao and self.inicio:
+            fracao = max(fracao, min(0.95, (time.time() - self.inicio) / self.duracao))
+        return self.etapa, fracao
+
+    def descricao_fonte(self):
+        """Arquivo de onde vieram os dados exibidos e quando ele foi alterado"""
+        if self.versao is None:
+            return None
+        caminho, mtime_ns = self.versao[1], self.versao[3]
+        alterado = time.strftime("%d/%m/%Y %H:%M", time.localtime(mtime_ns / 1e9))
+        return f"{os.path.basename(caminho)} (alterado em {alterado})"
+
+    def _etapa(self, descricao, progresso):
+        self.etapa, self.progresso = descricao, progresso
+
+    def _carregar(self, versao, exigir_estavel=True):
+        """Carrega a versão pedida e troca; retorna False se o arquivo mudou no meio"""
+        tipo, caminho = versao[:2]
+        self.inicio = time.time()
+        self._etapa("Conferindo o arquivo", 0.05)
+        conteudo = hash_arquivo(caminho)
+        if conteudo == self.hash and self._df is not None:
+            with self._lock:
+                self.versao = versao  # mesmo conteúdo, só a data mudou
+            return True
+        self._etapa(f"Lendo {os.path.basename(caminho)}", 0.15)
+        df = carregar_dataset(self.dataset, tipo)
+        if self.processar is not None:
+            self._etapa("Processando", 0.75)
+            df = self.processar(df)
+        if exigir_estavel and versao_fonte(self.dataset, self.fonte) != versao:
+            return False  # arquivo trocado durante a leitura: fica para a próxima
+        with self._lock:
+            self._df, self.versao, self.hash = df, versao, conteudo
+            self.carregado_em = time.time()
+            self.duracao = self.carregado_em - self.inicio
+            self.erro = None
+        return True
+
+    def _atualizar(self, versao, exigir_estavel=True):
+        try:
+            self._carregar(versao, exigir_estavel)
+        except Exception as e:
+            with self._lock:
+                self.erro, self._falhou = e, versao
+        finally:
+            self._etapa(None, 1.0)
+
+    def obter(self, esperar=True):
+        """
+        DataFrame da versão mais recente já processada
+
+        Uma fonte nova é processada em segundo plano e entra numa chamada
+        seguinte. Na primeira carga não há versão anterior: com esperar=True
+        a chamada aguarda; com esperar=False a carga vai para a thread e o
+        retorno é None até ela terminar. O retorno é uma cópia rasa: colunas
+        podem ser trocadas, mas não alteradas in-place.
+        """
+        versao = versao_fonte(self.dataset, self.fonte)
+        with self._lock:
+            pendente = versao != self.versao and versao != self._falhou
+            if pendente and not self.atualizando and (self._df is not None or not esperar):
+                # Sem versão anterior não há o que proteger de um arquivo ainda mudando
+                self._thread = threading.Thread(
+                    target=self._atualizar, args=(versao, self._df is not None), daemon=True
+                )
+                self._thread.start()
+            df = self._df
+            if df is None and not pendente and self.erro is not None:
+                raise self.erro
+
+        if df is None:
+            if not esperar:
+                return None
+            # Primeira carga esperando: aguarda a thread em andamento ou carrega aqui
+            # (uma sessão carrega, as outras esperam)
+            thread = self._thread
+            if thread is not None:
+                thread.join()
+            with self._lock_inicial:
+                if self._df is None:
+                    try:
+                        self._carregar(versao, exigir_estavel=False)
+                    finally:
+                        self._etapa(None, 1.0)
+                df = self._df
+        return df.copy(deep=False)
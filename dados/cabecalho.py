@@ -0,0 +1,87 @@
+"""Detecção da linha de cabeçalho das planilhas lendo só as primeiras linhas"""
+
+import os
+import threading
+
+from openpyxl import load_workbook
+
+from .colunas import chave_coluna
+
+# Quantas linhas do topo da planilha são examinadas
+MAX_LINHAS_BUSCA = 50
+
+# Mínimo de colunas esperadas reconhecidas para aceitar uma linha como cabeçalho
+MIN_COLUNAS_RECONHECIDAS = 3
+
+_cache = {}  # (caminho, versão, planilha, colunas) -> índice do cabeçalho
+_cache_lock = threading.Lock()
+
+
+def pontuar_linhas(caminho, colunas_esperadas, max_linhas=MAX_LINHAS_BUSCA, planilha=None):
+    """
+    Conta, para cada uma das primeiras linhas, quantas células são colunas esperadas
+
+    A planilha é aberta em modo read-only (streaming), então só as linhas
+    examinadas são lidas do arquivo.
+
+    Returns:
+        Lista com a pontuação de cada linha, na mesma numeração do header= do pandas
+    """
+    chaves = {chave_coluna(c) for c in colunas_esperadas}
+    wb = load_workbook(caminho, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb[planilha] if planilha else wb.worksheets[0]
+        pontos = []
+        for linha in ws.iter_rows(max_row=max_linhas, values_only=True):
+            valores = {chave_coluna(v) for v in linha if v is not None}
+            pontos.append(len(valores & chaves))
+        return pontos
+    finally:
+        wb.close()
+
+
+def detectar_cabecalho(
+    caminho,
+    colunas_esperadas,
+    max_linhas=MAX_LINHAS_BUSCA,
+    planilha=None,
+    minimo=MIN_COLUNAS_RECONHECIDAS,
+):
+    """
+    Encontra a linha de cabeçalho comparando as primeiras linhas com as colunas esperadas
+
+    Args:
+        caminho: Caminho do arquivo .xlsx
+        colunas_esperadas: Nomes de colunas que o cabeçalho deve conter
+        max_linhas: Quantidade de linhas examinadas a partir do topo
+        planilha: Nome da aba (padrão: primeira)
+        minimo: Colunas reconhecidas necessárias para aceitar a linha
+
+    Returns:
+        Índice da linha (0-based), pronto para o parâmetro header= do pandas
+    """
+    info = os.stat(caminho)
+    chave = (
+        caminho,
+        (info.st_size, info.st_mtime_ns),
+        planilha,
+        max_linhas,
+        tuple(colunas_esperadas),
+    )
+    with _cache_lock:
+        if chave in _cache:
+            return _cache[chave]
+
+    pontos = pontuar_linhas(caminho, colunas_esperadas, max_linhas, planilha)
+    minimo = min(minimo, len(colunas_esperadas))
+    melhor = max(range(len(pontos)), key=lambda i: pontos[i], default=None)
+
+    if melhor is None or pontos[melhor] < minimo:
+        raise ValueError(
+            f"Cabeçalho não encontrado nas primeiras {max_linhas} linhas de '{caminho}' "
+            f"(nenhuma linha com ao menos {minimo} colunas esperadas)"
+        )
+
+    with _cache_lock:
+        _cache[chave] = melhor
+    return melhor
@@ -0,0 +1,129 @@
+"""Nomes canônicos das colunas e normalização dos cabeçalhos das planilhas"""
+
+from .texto import normalizar_texto
+
+# Colunas do oris (nomes como aparecem no cabeçalho da linha 8 do oris.xlsx)
+COLUNAS_ORIS = [
+    "ID",
+    "Nome",
+    "Dt Admissão",
+    "Tipo Contrato",
+    "Jornada",
+    "Agente Nocivo",
+    "Vinculo Empregatício",
+    "Categoria Trabalhador",
+    "Motivo Admissão",
+    "Dt Nascimento",
+    "Sexo",
+    "CPF",
+    "Dt Rescisão",
+    "Demitido",
+    "Tipo Rescisão",
+    "Dt Início Cargo",
+    "Código do Cargo",
+    "Cargo",
+    "Função",
+    "CBO",
+    "Descrição CBO",
+    "Motivo Cargo",
+    "Dt Início Centro de Custo",
+    "Código Centro de Custo",
+    "Centro custo",
+    "Dt Início Empresa",
+    "Nome Fantasia",
+    "Dt Início Escala",
+    "Dt Início Local de Trabalho",
+    "Local de Trabalho",
+    "Dt Início Situação",
+    "Situação",
+    "Dt Início Tipo Funcionário",
+    "Tipo Funcionário",
+    "Linha de cuidado",
+]
+
+COLUNAS_DATA_ORIS = [
+    "Dt Admissão",
+    "Dt Rescisão",
+    "Dt Nascimento",
+    "Dt Início Cargo",
+    "Dt Início Centro de Custo",
+    "Dt Início Empresa",
+    "Dt Início Escala",
+    "Dt Início Local de Trabalho",
+    "Dt Início Situação",
+    "Dt Início Tipo Funcionário",
+]
+
+# Colunas da Base_Bi.xlsx (sem os espaços sobrando do cabeçalho original)
+COLUNAS_BASE_BI = [
+    "Nº Processo",
+    "LINHA DE CUIDADO",
+    "UNIDADE",
+    "FUNÇÃO",
+    "MOTIVO DO DESLIGAMENTO",
+    "TIPO DE PROCESSO",
+    "PRAZO CONTRATUAL",
+    "CARGA HORARIA SEMANAL",
+    "CARGA HORARIA MENSAL",
+    "ESCALA",
+    "NOME - COLABORADOR",
+    "DATA ABERTURA DA VAGA",
+    "REQUISIÇÃO",
+    "SUBSTITUIDO POR",
+    "DATA DE FECHAMENTO VAGA EM SELEÇÃO",
+    "DATA DE INÍCIO SUBSTITUIÇÃO",
+    "DATA PREFERENCIAL PARA CONTRATAÇÃO",
+    "ANALISTA RESPONSÁVEL PELO PROCESSO",
+    "SLA",
+    "Mês",
+    "Ano",
+    "Status Vaga",
+    "Nivel",
+    "Dias de Atraso",
+]
+
+COLUNAS_DATA_BASE_BI = [
+    "DATA ABERTURA DA VAGA",
+    "DATA DE FECHAMENTO VAGA EM SELEÇÃO",
+    "DATA DE INÍCIO SUBSTITUIÇÃO",
+]
+
+# Variações de nome já vistas nas exportações e scripts -> nome canônico
+ALIASES_COLUNAS = {
+    "oris": {
+        "Centro de Custo": "Centro custo",
+        "Data Admissão": "Dt Admissão",
+        "Data Rescisão": "Dt Rescisão",
+    },
+    "base_bi": {
+        "Nº do Processo": "Nº Processo",
+        "Linha": "LINHA DE CUIDADO",
+    },
+}
+
+
+def chave_coluna(nome):
+    """Chave de comparação de cabeçalhos: sem acento, caixa, '_' nem espaços extras"""
+    return normalizar_texto(str(nome).replace("_", " "))
+
+
+def _montar_mapa(colunas, aliases):
+    mapa = {chave_coluna(c): c for c in colunas}
+    mapa.update({chave_coluna(a): c for a, c in aliases.items()})
+    return mapa
+
+
+MAPA_COLUNAS = {
+    "oris": _montar_mapa(COLUNAS_ORIS, ALIASES_COLUNAS["oris"]),
+    "base_bi": _montar_mapa(COLUNAS_BASE_BI, ALIASES_COLUNAS["base_bi"]),
+}
+
+
+def nome_canonico(nome, dataset="oris"):
+    """Traduz um cabeçalho para o nome canônico (ex: 'Centro Custo' -> 'Centro custo')"""
+    return MAPA_COLUNAS.get(dataset, {}).get(chave_coluna(nome), str(nome).strip())
+
+
+def normalizar_colunas(df, dataset="oris"):
+    """Renomeia as colunas do DataFrame para os nomes canônicos do dataset"""
+    return df.rename(columns=lambda c: nome_canonico(c, dataset))
@@ -0,0 +1,135 @@
+"""Leitura de planilhas em blocos (streaming), com memória limitada ao tamanho do bloco"""
+
+import warnings
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils.cell import column_index_from_string
+
+from .colunas import chave_coluna, nome_canonico
+from .fontes import resolver_cabecalho
+
+try:  # parser interno do openpyxl, usado para projetar colunas durante a leitura
+    from openpyxl.worksheet._reader import WorkSheetParser
+except ImportError:  # pragma: no cover - versões do openpyxl sem o módulo
+    WorkSheetParser = None
+
+TAMANHO_BLOCO = 5000
+
+
+if WorkSheetParser is not None:
+
+    class _ParserProjetado(WorkSheetParser):
+        """Parser de linhas que pula, sem interpretar, as células fora das colunas pedidas"""
+
+        def __init__(self, *args, colunas, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.colunas = colunas  # índices 1-based
+
+        def parse_row(self, row):
+            idx, celulas = super().parse_row(row)
+            return idx, [c for c in celulas if c is not None]
+
+        def parse_cell(self, element):
+            coordenada = element.get("r")
+            coluna = (
+                column_index_from_string(coordenada.rstrip("0123456789"))
+                if coordenada
+                else self.col_counter + 1
+            )
+            if coluna not in self.colunas:
+                self.col_counter = coluna
+                return None
+            return super().parse_cell(element)
+
+
+def _linhas_projetadas(ws, inicio, indices):
+    """Valores das colunas `indices` (0-based) das linhas a partir de `inicio` (1-based)"""
+    colunas = [i + 1 for i in indices]
+    wb = ws.parent
+    with ws._get_source() as fonte:
+        parser = _ParserProjetado(
+            fonte,
+            ws._shared_strings,
+            data_only=wb.data_only,
+            epoch=wb.epoch,
+            date_formats=wb._date_formats,
+            timedelta_formats=wb._timedelta_formats,
+            colunas=set(colunas),
+        )
+        for idx, celulas in parser.parse():
+            if idx < inicio:
+                continue
+            valores = {c["column"]: c["value"] for c in celulas}
+            yield idx, tuple(valores.get(c) for c in colunas)
+
+
+def _linhas(ws, inicio, indices, largura):
+    """Linhas de dados já reduzidas às colunas `indices`"""
+    if WorkSheetParser is not None and len(indices) < largura and hasattr(ws, "_get_source"):
+        # Planilha read-only: as células não pedidas nem chegam a ser interpretadas.
+        # O parser usa partes internas do openpyxl; se elas mudarem, segue pela
+        # API pública a partir da linha em que parou.
+        try:
+            for idx, valores in _linhas_projetadas(ws, inicio, indices):
+                yield valores
+                inicio = idx + 1
+            return
+        except (TypeError, AttributeError, KeyError) as e:
+            warnings.warn(f"Leitura projetada indisponível nesta versão do openpyxl ({e}); lendo todas as colunas")
+    for linha in ws.iter_rows(min_row=inicio, values_only=True):
+        yield tuple(linha[i] if i < len(linha) else None for i in indices)
+
+
+def ler_blocos(
+    caminho,
+    header="auto",
+    colunas=None,
+    tamanho_bloco=TAMANHO_BLOCO,
+    dataset="oris",
+    planilha=None,
+):
+    """
+    Lê a planilha em modo read-only e devolve DataFrames de até tamanho_bloco linhas
+
+    Args:
+        caminho: Caminho do arquivo .xlsx
+        header: Índice da linha do cabeçalho ou "auto"
+        colunas: Colunas a manter (nome original ou canônico); None = todas
+        tamanho_bloco: Linhas por bloco
+        dataset: Dataset usado para detectar o cabeçalho e padronizar os nomes
+        planilha: Nome da aba (padrão: primeira)
+
+    Yields:
+        DataFrame com cabeçalhos canônicos (sem linhas totalmente vazias)
+    """
+    header = resolver_cabecalho(caminho, header, dataset)
+    wb = load_workbook(caminho, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb[planilha] if planilha else wb.worksheets[0]
+        bruto = next(ws.iter_rows(min_row=header + 1, max_row=header + 1, values_only=True), None) or ()
+
+        nomes = [
+            nome_canonico(c, dataset) if c is not None else f"Unnamed: {i}"
+            for i, c in enumerate(bruto)
+        ]
+        if colunas:
+            chaves = {chave_coluna(c) for c in colunas}
+            indices = [i for i, c in enumerate(bruto) if c is not None and chave_coluna(c) in chaves]
+        else:
+            indices = list(range(len(nomes)))
+        nomes = [nomes[i] for i in indices]
+
+        bloco, emitiu = [], False
+        for valores in _linhas(ws, header + 2, indices, len(bruto)):
+            if all(v is None for v in valores):
+                continue
+            bloco.append(valores)
+            if len(bloco) >= tamanho_bloco:
+                yield pd.DataFrame(bloco, columns=nomes)
+                bloco, emitiu = [], True
+        # Planilha sem dados ainda gera um bloco vazio, com as colunas
+        if bloco or not emitiu:
+            yield pd.DataFrame(bloco, columns=nomes)
+    finally:
+        wb.close()
@@ -0,0 +1,274 @@
+"""Localização, leitura e cache das fontes de dados (xlsx, sqlite ou parquet)"""
+
+import glob
+import hashlib
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from .cabecalho import detectar_cabecalho
+from .colunas import (
+    COLUNAS_BASE_BI,
+    COLUNAS_DATA_BASE_BI,
+    COLUNAS_DATA_ORIS,
+    COLUNAS_ORIS,
+    chave_coluna,
+    normalizar_colunas,
+)
+
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pasta onde ficam oris.xlsx, oris.db, Base_Bi.xlsx... (padrão: raiz do projeto)
+DIRETORIO_DADOS = os.environ.get("DASH_DADOS_DIR", RAIZ_PROJETO)
+DIRETORIO_CACHE = os.path.join(DIRETORIO_DADOS, ".cache")
+
+# Ordem de preferência de "auto" quando dois arquivos têm a mesma data de modificação
+FONTES = ("parquet", "sqlite", "xlsx")
+
+# Fonte usada quando nenhuma é pedida. Não é "auto": o oris.db gerado com menos
+# colunas (ou atualizado por um script) não pode virar a fonte sem ninguém pedir
+FONTE_PADRAO = os.environ.get("DASH_FONTE", "xlsx")
+
+# Sobe quando muda o que vai para o cache em disco (preparar(), normalização...)
+VERSAO_CACHE = 1
+
+DATASETS = {
+    "oris": {
+        "xlsx": "oris.xlsx",
+        "sqlite": "oris.db",
+        "parquet": "oris.parquet",
+        "tabela": "oris",
+        "header": "auto",  # hoje na linha 8, mas detectado a cada versão do arquivo
+        "colunas": COLUNAS_ORIS,
+        "datas": COLUNAS_DATA_ORIS,
+    },
+    "base_bi": {
+        "xlsx": "Base_Bi.xlsx",
+        "parquet": "Base_Bi.parquet",
+        "header": "auto",
+        "colunas": COLUNAS_BASE_BI,
+        "datas": COLUNAS_DATA_BASE_BI,
+    },
+}
+
+_cache = {}  # (dataset, tipo, colunas) -> (versão da fonte, DataFrame)
+_cache_lock = threading.Lock()
+
+
+def caminho_dados(nome):
+    """Caminho de um arquivo dentro da pasta de dados"""
+    return os.path.join(DIRETORIO_DADOS, nome)
+
+
+def assinatura_arquivo(caminho):
+    """Identifica a versão de um arquivo pelo tamanho e data de modificação"""
+    info = os.stat(caminho)
+    return info.st_size, info.st_mtime_ns
+
+
+def localizar_fonte(dataset, fonte=None):
+    """
+    Escolhe o arquivo a ser lido para o dataset
+
+    Args:
+        dataset: Nome do dataset ("oris" ou "base_bi")
+        fonte: "xlsx", "sqlite", "parquet" ou "auto", que escolhe o arquivo
+            mais recente (padrão: FONTE_PADRAO, da variável DASH_FONTE ou "xlsx")
+
+    Returns:
+        Tupla (tipo, caminho)
+    """
+    config = DATASETS[dataset]
+    fonte = fonte or FONTE_PADRAO
+    tipos = [t for t in (FONTES if fonte == "auto" else (fonte,)) if t in config]
+
+    existentes = [
+        (tipo, caminho_dados(config[tipo]))
+        for tipo in tipos
+        if os.path.exists(caminho_dados(config[tipo]))
+    ]
+    if not existentes:
+        nomes = " / ".join(f"'{config[t]}'" for t in tipos)
+        raise FileNotFoundError(
+            f"Nenhuma fonte encontrada para '{dataset}' ({nomes}) em {DIRETORIO_DADOS}"
+            f" (fonte '{fonte}'; escolha outra com DASH_FONTE)"
+        )
+
+    # max() mantém o primeiro em caso de empate, respeitando a ordem de FONTES
+    return max(existentes, key=lambda item: os.path.getmtime(item[1]))
+
+
+def _filtro_colunas(colunas):
+    """Função usecols que aceita o cabeçalho original ou o canônico"""
+    chaves = {chave_coluna(c) for c in colunas}
+    return lambda nome: chave_coluna(nome) in chaves
+
+
+def resolver_cabecalho(caminho, header, dataset="oris"):
+    """Converte header="auto" no índice detectado a partir das colunas do dataset"""
+    if header != "auto":
+        return header
+    return detectar_cabecalho(caminho, DATASETS[dataset]["colunas"])
+
+
+def ler_fonte(tipo, caminho, header=0, tabela=None, colunas=None, dataset="oris"):
+    """Lê um arquivo bruto, opcionalmente só com as colunas pedidas"""
+    usecols = _filtro_colunas(colunas) if colunas else None
+
+    if tipo == "xlsx":
+        header = resolver_cabecalho(caminho, header, dataset)
+        if colunas:
+            # Leitura em streaming que nem interpreta as células das outras colunas
+            from .excel import ler_blocos
+
+            return pd.concat(
+                ler_blocos(caminho, header=header, colunas=colunas, dataset=dataset),
+                ignore_index=True,
+            )
+        return pd.read_excel(caminho, header=header, usecols=usecols)
+
+    if tipo == "sqlite":
+        conn = sqlite3.connect(caminho)
+        try:
+            existentes = [
+                r[1] for r in conn.execute(f'PRAGMA table_info("{tabela}")')
+            ]
+            selecionadas = [c for c in existentes if usecols is None or usecols(c)]
+            campos = ", ".join(f'"{c}"' for c in selecionadas)
+            return pd.read_sql(f'SELECT {campos} FROM "{tabela}"', conn)
+        finally:
+            conn.close()
+
+    if tipo == "parquet":
+        df = pd.read_parquet(caminho)
+        return df[[c for c in df.columns if usecols(c)]] if usecols else df
+
+    raise ValueError(f"Tipo de fonte desconhecido: '{tipo}'")
+
+
+def converter_data(serie):
+    """Converte datas dd/mm/aaaa (Excel) ou ISO aaaa-mm-dd (oris.db) para datetime"""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    amostra = serie.dropna().astype(str).head(20)
+    if len(amostra) and amostra.str.match(r"^\d{4}-\d{2}-\d{2}").all():
+        return pd.to_datetime(serie, errors="coerce", format="ISO8601")
+    return pd.to_datetime(serie, errors="coerce", dayfirst=True)
+
+
+def preparar(df, dataset, colunas_data=None):
+    """Remove linhas vazias, padroniza cabeçalhos e converte as colunas de data"""
+    df = normalizar_colunas(df.dropna(how="all"), dataset)
+    for col in colunas_data or []:
+        if col in df.columns:
+            df[col] = converter_data(df[col])
+    return df
+
+
+def ler_planilha(caminho, header="auto", colunas=None, dataset="oris"):
+    """Lê uma planilha avulsa (ex: oris_selecionado.xlsx) já normalizada, sem cache"""
+    df = ler_fonte("xlsx", caminho, header=header, colunas=colunas, dataset=dataset)
+    return preparar(df, dataset, DATASETS.get(dataset, {}).get("datas"))
+
+
+def _caminho_cache_disco(dataset, tipo, assinatura):
+    """Arquivo de cache da versão da fonte, das colunas esperadas e do formato do cache"""
+    tamanho, mtime = assinatura
+    esquema = repr((VERSAO_CACHE, DATASETS[dataset]["colunas"], DATASETS[dataset]["datas"]))
+    chave = hashlib.sha1(esquema.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(DIRETORIO_CACHE, f"{dataset}-{tipo}-{tamanho}-{mtime}-{chave}.pkl")
+
+
+def _ler_cache_disco(caminho_cache):
+    try:
+        return pd.read_pickle(caminho_cache)
+    except Exception:
+        return None
+
+
+def _gravar_cache_disco(dataset, caminho_cache, df):
+    """Grava o DataFrame já processado e apaga versões antigas do mesmo dataset"""
+    try:
+        os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+        temporario = caminho_cache + ".tmp"
+        df.to_pickle(temporario)
+        os.replace(temporario, caminho_cache)
+        for antigo in glob.glob(os.path.join(DIRETORIO_CACHE, f"{dataset}-*.pkl")):
+            if antigo != caminho_cache:
+                os.remove(antigo)
+    except OSError:
+        pass  # cache em disco é só otimização
+
+
+def carregar_dataset(dataset, fonte=None, colunas=None, usar_cache=True):
+    """
+    Carrega um dataset pela fonte escolhida, com cache em memória e em disco
+
+    O Excel é processado uma única vez por versão do arquivo: o resultado fica
+    em .cache/ e é reaproveitado pelos outros processos (apps e scripts).
+    O DataFrame retornado não deve ser alterado in-place.
+
+    Args:
+        dataset: Nome do dataset ("oris" ou "base_bi")
+        fonte: "xlsx", "sqlite", "parquet" ou "auto"
+        colunas: Lista de colunas (nomes canônicos) a carregar; None = todas
+        usar_cache: False força a releitura da fonte
+
+    Returns:
+        DataFrame com cabeçalhos canônicos e datas convertidas
+    """
+    config = DATASETS[dataset]
+    tipo, caminho = localizar_fonte(dataset, fonte)
+    assinatura = assinatura_arquivo(caminho)
+    # Uma entrada por tipo de fonte: alternar xlsx/sqlite não descarta a outra
+    entrada = (dataset, tipo, tuple(colunas) if colunas else None)
+    chave = (tipo, caminho, assinatura)
+
+    if usar_cache:
+        with _cache_lock:
+            item = _cache.get(entrada)
+        if item is not None and item[0] == chave:
+            return item[1].copy(deep=False)
+
+    df = None
+    caminho_cache = _caminho_cache_disco(dataset, tipo, assinatura)
+    if usar_cache and tipo == "xlsx" and os.path.exists(caminho_cache):
+        df = _ler_cache_disco(caminho_cache)
+        if df is not None and colunas:
+            df = df[[c for c in colunas if c in df.columns]]
+
+    if df is None:
+        bruto = ler_fonte(
+            tipo,
+            caminho,
+            header=config.get("header", 0),
+            tabela=config.get("tabela"),
+            colunas=colunas,
+            dataset=dataset,
+        )
+        df = preparar(bruto, dataset, config.get("datas"))
+        # Só a leitura completa do Excel vai para o disco (serve a qualquer projeção)
+        if usar_cache and tipo == "xlsx" and not colunas:
+            _gravar_cache_disco(dataset, caminho_cache, df)
+
+    with _cache_lock:
+        _cache[entrada] = (chave, df)
+    return df.copy(deep=False)
+
+
+def carregar_oris(fonte=None, colunas=None, usar_cache=True):
+    """Carrega o cadastro de colaboradores do oris"""
+    return carregar_dataset("oris", fonte, colunas, usar_cache)
+
+
+def carregar_base_bi(fonte=None, colunas=None, usar_cache=True):
+    """Carrega a base de vagas Base_Bi.xlsx"""
+    return carregar_dataset("base_bi", fonte, colunas, usar_cache)
+
+
+def limpar_cache():
+    """Descarta o cache em memória (o cache em disco se renova pela versão do arquivo)"""
+    with _cache_lock:
+        _cache.clear()
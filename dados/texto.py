@@ -0,0 +1,20 @@
+"""Normalização de textos usada para comparar cargos, unidades, nomes e cabeçalhos"""
+
+import unicodedata
+
+import pandas as pd
+
+
+def normalizar_texto(valor):
+    """Remove acentos, espaços extras e padroniza em maiúsculas"""
+    if pd.isna(valor):
+        return ""
+    texto = unicodedata.normalize("NFKD", str(valor))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.upper().split())
+
+
+def normalizar_serie(serie):
+    """Normaliza uma coluna de texto calculando cada valor distinto uma única vez"""
+    mapa = {v: normalizar_texto(v) for v in serie.dropna().unique()}
+    return serie.map(mapa).fillna("")
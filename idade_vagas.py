@@ -0,0 +1,154 @@
+"""
+Índice de envelhecimento das vagas em aberto (sem data de fechamento) da Base_Bi.xlsx
+
+As datas de abertura ficam ordenadas por (Linha de Cuidado, Nível), então as
+contagens por faixa de dias são obtidas por busca binária: virar o dia só muda
+os limites da busca, e mudanças na planilha só mexem nas vagas alteradas.
+
+Um mesmo Nº Processo pode aparecer em mais de uma linha em aberto: cada linha
+conta como uma vaga (chave processo + ocorrência, ver vagas_abertas) e os
+repetidos ficam em `duplicados` para a interface avisar.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left, insort
+from datetime import date
+from itertools import islice
+
+import pandas as pd
+
+# Faixas de dias em aberto: (rótulo, idade mínima, idade máxima)
+FAIXAS_IDADE = [
+    ("0–15 dias", 0, 15),
+    ("16–30 dias", 16, 30),
+    ("31–60 dias", 31, 60),
+    (">60 dias", 61, None),
+]
+
+
+COLUNA_OCORRENCIA = "Ocorrência"
+
+
+def vagas_abertas(
+    df,
+    coluna_processo="Nº Processo",
+    coluna_abertura="DATA ABERTURA DA VAGA",
+    coluna_fechamento="DATA DE FECHAMENTO VAGA EM SELEÇÃO",
+):
+    """Linhas sem data de fechamento e com abertura válida, numeradas por processo
+
+    A data de abertura vira datetime (texto inválido é descartado) e a coluna
+    COLUNA_OCORRENCIA diz qual linha do processo é (1, 2, ...), na ordem da
+    planilha: junto com o Nº Processo, identifica a vaga.
+    """
+    abertura = pd.to_datetime(df[coluna_abertura], errors="coerce")
+    mascara = df[coluna_fechamento].isna() & abertura.notna()
+    abertas = df[mascara].assign(**{coluna_abertura: abertura[mascara]})
+    abertas[COLUNA_OCORRENCIA] = (
+        abertas.groupby(coluna_processo, sort=False, dropna=False).cumcount() + 1
+    )
+    return abertas
+
+
+class IndiceIdadeVagas:
+    """Mantém as vagas abertas agrupadas por (linha de cuidado, nível)"""
+
+    def __init__(self):
+        self._vagas = {}  # (processo, ocorrência) -> (grupo, ordinal da data de abertura)
+        self._grupos = {}  # grupo -> lista ordenada de (ordinal, (processo, ocorrência))
+        self.duplicados = {}  # processo repetido entre as vagas abertas -> linhas
+        self._assinatura = None
+        self._lock = threading.Lock()
+
+    def atualizar(
+        self,
+        df,
+        coluna_processo="Nº Processo",
+        coluna_linha="LINHA DE CUIDADO",
+        coluna_nivel="Nivel",
+        coluna_abertura="DATA ABERTURA DA VAGA",
+        coluna_fechamento="DATA DE FECHAMENTO VAGA EM SELEÇÃO",
+    ):
+        """Sincroniza o índice com a planilha, aplicando apenas as diferenças
+
+        Returns:
+            Tupla (adicionadas, removidas, alteradas)
+        """
+        abertas = vagas_abertas(df, coluna_processo, coluna_abertura, coluna_fechamento)[
+            [coluna_processo, COLUNA_OCORRENCIA, coluna_linha, coluna_nivel, coluna_abertura]
+        ]
+
+        assinatura = int(pd.util.hash_pandas_object(abertas, index=False).sum())
+        with self._lock:
+            if assinatura == self._assinatura:
+                return 0, 0, 0
+
+            # A n-ésima linha de um processo é sempre a mesma chave: repetidos não
+            # se sobrescrevem e uma linha alterada continua sendo a mesma vaga
+            atuais, ocorrencias = {}, {}
+            for processo, n, linha, nivel, abertura in abertas.itertuples(index=False, name=None):
+                ocorrencias[processo] = n
+                atuais[(processo, n)] = ((linha, nivel), abertura.toordinal())
+            self.duplicados = {p: n for p, n in ocorrencias.items() if n > 1}
+
+            removidas = [p for p in self._vagas if p not in atuais]
+            alteradas = [
+                p for p, v in atuais.items() if p in self._vagas and self._vagas[p] != v
+            ]
+            adicionadas = [p for p in atuais if p not in self._vagas]
+
+            for processo in removidas + alteradas:
+                self._remover(processo)
+            for processo in alteradas + adicionadas:
+                self._inserir(processo, *atuais[processo])
+
+            self._assinatura = assinatura
+            return len(adicionadas), len(removidas), len(alteradas)
+
+    def _inserir(self, processo, grupo, ordinal):
+        self._vagas[processo] = (grupo, ordinal)
+        insort(self._grupos.setdefault(grupo, []), (ordinal, processo))
+
+    def _remover(self, processo):
+        grupo, ordinal = self._vagas.pop(processo)
+        lista = self._grupos[grupo]
+        del lista[bisect_left(lista, (ordinal, processo))]
+        if not lista:
+            del self._grupos[grupo]
+
+    def __len__(self):
+        return len(self._vagas)
+
+    def contagens(self, hoje=None):
+        """Conta as vagas por faixa de idade para cada (linha de cuidado, nível)"""
+        hoje = (hoje or date.today()).toordinal()
+        linhas = []
+        with self._lock:
+            for (linha, nivel), lista in self._grupos.items():
+                registro = {"Linha de Cuidado": linha, "Nivel": nivel}
+                # Índice do primeiro elemento com idade <= limite de cada faixa
+                anterior = len(lista)
+                for rotulo, _, idade_max in FAIXAS_IDADE:
+                    if idade_max is None:
+                        inicio = 0
+                    else:
+                        inicio = bisect_left(lista, (hoje - idade_max,))
+                    registro[rotulo] = anterior - inicio
+                    anterior = inicio
+                registro["Total"] = len(lista)
+                linhas.append(registro)
+
+        colunas = ["Linha de Cuidado", "Nivel"] + [f[0] for f in FAIXAS_IDADE] + ["Total"]
+        return pd.DataFrame(linhas, columns=colunas)
+
+    def mais_antigas(self, quantidade=20, hoje=None):
+        """Retorna as vagas abertas há mais tempo: [(processo, ocorrência, dias em aberto)]
+
+        Um processo repetido aparece uma vez por linha em aberto; a ocorrência
+        é a mesma de vagas_abertas(), para buscar a linha certa da planilha.
+        """
+        hoje = (hoje or date.today()).toordinal()
+        with self._lock:
+            antigas = list(islice(heapq.merge(*self._grupos.values()), quantidade))
+        return [(processo, n, hoje - ordinal) for ordinal, (processo, n) in antigas]
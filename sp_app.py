@@ -1,8 +1,10 @@
+import time
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import os
+from dados import DatasetAoVivo
+from idade_vagas import IndiceIdadeVagas, FAIXAS_IDADE, COLUNA_OCORRENCIA, vagas_abertas
 
 st.set_page_config(page_title="Dashboard de Indicadores RH", layout="wide", page_icon="📊")
 
@@ -19,13 +21,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_data():
-    # Lê o arquivo Base_Bi.xlsx da mesma pasta do projeto
-    caminho_arquivo = os.path.join(os.path.dirname(__file__), 'Base_Bi.xlsx')
-    df = pd.read_excel(caminho_arquivo)
-    df = df.dropna(how='all')
-    
+def processar_base_bi(df):
+    # Roda na thread de atualização do DatasetAoVivo: nada de st.* aqui
     # Limpar espaços extras na coluna Nivel
     df['Nivel'] = df['Nivel'].apply(lambda x: str(x).strip() if pd.notna(x) else 'Não Classificado')
     
@@ -33,13 +30,34 @@ def load_data():
     df['LINHA DE CUIDADO'] = df['LINHA DE CUIDADO'].apply(lambda x: str(x).strip() if pd.notna(x) else 'Não Classificado')
     
     # Calcular tempo de fechamento em seleção (dias)
-    df['Tempo Seleção (dias)'] = (df['DATA DE FECHAMENTO VAGA EM SELEÇÃO '] - df['DATA ABERTURA DA VAGA']).dt.days
+    df['Tempo Seleção (dias)'] = (df['DATA DE FECHAMENTO VAGA EM SELEÇÃO'] - df['DATA ABERTURA DA VAGA']).dt.days
     
     # Calcular tempo de admissão (dias)
-    df['Tempo Admissão (dias)'] = (df['DATA DE INÍCIO SUBSTITUIÇÃO'] - df['DATA DE FECHAMENTO VAGA EM SELEÇÃO ']).dt.days
+    df['Tempo Admissão (dias)'] = (df['DATA DE INÍCIO SUBSTITUIÇÃO'] - df['DATA DE FECHAMENTO VAGA EM SELEÇÃO']).dt.days
     
     return df
 
+@st.cache_resource
+def obter_dados_base_bi():
+    # Base_Bi.xlsx processada uma vez por versão do arquivo (tamanho/data + hash), compartilhada entre sessões
+    return DatasetAoVivo("base_bi", processar=processar_base_bi)
+
+def load_data():
+    # Versão anterior continua valendo enquanto uma nova Base_Bi.xlsx é processada em segundo plano;
+    # None enquanto a primeira carga do processo ainda está na thread
+    return obter_dados_base_bi().obter(esperar=False)
+
+def mostrar_andamento(dados, nome):
+    # Barra de progresso da carga em segundo plano
+    etapa, fracao = dados.andamento()
+    decorrido = time.time() - dados.inicio if dados.inicio else 0
+    st.progress(fracao, text=f"🔄 {nome}: {etapa or 'concluindo'}... ({decorrido:.0f}s)")
+
+@st.cache_resource
+def obter_indice_idade():
+    # Índice compartilhado entre sessões, atualizado incrementalmente a cada rerun
+    return IndiceIdadeVagas()
+
 # Carregar dados
 try:
     df = load_data()
@@ -57,8 +75,37 @@ if not dados_carregados:
     st.info("Certifique-se de que o arquivo 'Base_Bi.xlsx' está na mesma pasta do dashboard.")
     st.stop()
 
+dados_base_bi = obter_dados_base_bi()
+if df is None:
+    # Primeira carga do processo: ninguém fica preso no parse; a página se refaz até a troca
+    mostrar_andamento(dados_base_bi, "Carregando a Base_Bi")
+    time.sleep(1)
+    st.rerun()
+st.caption(f"📂 Fonte: {dados_base_bi.descricao_fonte()}")
+if dados_base_bi.atualizando:
+    st.info("🔄 Nova versão da Base_Bi encontrada: processando em segundo plano, os dados atuais seguem valendo.")
+    mostrar_andamento(dados_base_bi, "Nova versão da Base_Bi")
+elif dados_base_bi.erro is not None:
+    st.warning(f"⚠️ A nova versão da Base_Bi não pôde ser carregada ({dados_base_bi.erro}); exibindo a anterior.")
+
+# Troca para a nova versão assim que ela fica pronta, sem esperar uma interação
+if hasattr(st, "fragment"):
+    carregado_em = dados_base_bi.carregado_em
+
+    @st.fragment(run_every="5s")
+    def acompanhar_base_bi():
+        dataset = obter_dados_base_bi()
+        try:
+            dataset.obter(esperar=False)  # confere a fonte (os.stat) e dispara a recarga em segundo plano
+        except FileNotFoundError:
+            pass  # arquivo sendo trocado: a versão atual segue valendo
+        if dataset.carregado_em != carregado_em:
+            st.rerun()
+
+    acompanhar_base_bi()
+
 # Tabs principais
-tab1, tab2, tab3 = st.tabs(["🎯 Vagas Trabalhadas", "🚪 Motivos de Desligamento", "⏱️ Tempo Médio de Fechamento"])
+tab1, tab2, tab3, tab4 = st.tabs(["🎯 Vagas Trabalhadas", "🚪 Motivos de Desligamento", "⏱️ Tempo Médio de Fechamento", "⏳ Vagas em Aberto"])
 
 # Obter lista de níveis únicos (excluindo 'Não Classificado')
 NIVEIS = [n for n in df['Nivel'].unique() if n != 'Não Classificado']
@@ -435,6 +482,84 @@ with tab3:
         fig_linha.update_layout(xaxis_title='Período', yaxis_title='Dias', hovermode='x unified')
         st.plotly_chart(fig_linha, use_container_width=True)
 
+# ============ TAB 4: VAGAS EM ABERTO ============
+with tab4:
+    st.header("Envelhecimento das Vagas em Aberto")
+    st.caption("Vagas sem data de fechamento em seleção, por dias desde a abertura")
+    
+    indice_idade = obter_indice_idade()
+    indice_idade.atualizar(df)
+    if indice_idade.duplicados:
+        repetidos = ", ".join(f"{p} ({n}x)" for p, n in list(indice_idade.duplicados.items())[:10])
+        st.warning(
+            f"⚠️ {len(indice_idade.duplicados)} Nº Processo aparecem em mais de uma vaga em aberto; "
+            f"cada linha conta como uma vaga: {repetidos}"
+        )
+    
+    if len(indice_idade) == 0:
+        st.info("Nenhuma vaga em aberto")
+    else:
+        df_idade = indice_idade.contagens()
+        rotulos_faixas = [f[0] for f in FAIXAS_IDADE]
+        
+        # Métricas por faixa
+        cols_faixa = st.columns(len(rotulos_faixas) + 1)
+        for col, rotulo in zip(cols_faixa, rotulos_faixas):
+            with col:
+                st.metric(label=rotulo, value=int(df_idade[rotulo].sum()))
+        with cols_faixa[-1]:
+            st.metric(label="**TOTAL EM ABERTO**", value=len(indice_idade))
+        
+        st.markdown("---")
+        
+        # Filtro por linha de cuidado
+        linhas_idade = sorted(df_idade['Linha de Cuidado'].unique())
+        linha_idade = st.multiselect("Filtrar por Linha de Cuidado:", linhas_idade, default=linhas_idade, key='linha_idade')
+        if linha_idade:
+            df_idade = df_idade[df_idade['Linha de Cuidado'].isin(linha_idade)]
+        
+        col_i1, col_i2 = st.columns(2)
+        
+        with col_i1:
+            st.subheader("📊 Vagas por Faixa e Linha de Cuidado")
+            df_idade_linha = df_idade.groupby('Linha de Cuidado')[rotulos_faixas].sum().reset_index()
+            df_idade_linha = df_idade_linha.melt(id_vars='Linha de Cuidado', var_name='Faixa', value_name='Quantidade')
+            if not df_idade_linha.empty:
+                fig_idade = px.bar(df_idade_linha, x='Linha de Cuidado', y='Quantidade', color='Faixa',
+                                  barmode='stack', category_orders={'Faixa': rotulos_faixas},
+                                  color_discrete_sequence=['#4CAF50', '#FFC107', '#FF9800', '#FF5252'])
+                fig_idade.update_layout(xaxis_title='Linha de Cuidado', yaxis_title='Vagas em Aberto', xaxis_tickangle=-45)
+                st.plotly_chart(fig_idade, use_container_width=True)
+        
+        with col_i2:
+            st.subheader("📊 Vagas por Faixa e Nível")
+            df_idade_nivel = df_idade.groupby('Nivel')[rotulos_faixas].sum().reset_index()
+            df_idade_nivel = df_idade_nivel.melt(id_vars='Nivel', var_name='Faixa', value_name='Quantidade')
+            if not df_idade_nivel.empty:
+                fig_idade_nivel = px.bar(df_idade_nivel, x='Nivel', y='Quantidade', color='Faixa',
+                                        barmode='stack', category_orders={'Faixa': rotulos_faixas},
+                                        color_discrete_sequence=['#4CAF50', '#FFC107', '#FF9800', '#FF5252'])
+                fig_idade_nivel.update_layout(xaxis_title='Nível', yaxis_title='Vagas em Aberto', xaxis_tickangle=-45)
+                st.plotly_chart(fig_idade_nivel, use_container_width=True)
+        
+        # Tabela detalhada por Linha de Cuidado e Nível
+        st.subheader("📋 Detalhamento: Faixas por Linha de Cuidado e Nível")
+        st.dataframe(df_idade.sort_values(['Linha de Cuidado', 'Nivel']), hide_index=True, use_container_width=True)
+        
+        # Vagas mais antigas
+        st.subheader("🕰️ Vagas Abertas Há Mais Tempo")
+        qtd_antigas = st.slider("Quantidade de vagas:", 5, 100, 20, key='qtd_antigas')
+        antigas = pd.DataFrame(indice_idade.mais_antigas(qtd_antigas),
+                               columns=['Nº Processo', COLUNA_OCORRENCIA, 'Dias em Aberto'])
+        # Só as linhas em aberto, casadas pela ocorrência: um processo repetido não multiplica a tabela
+        df_antigas = antigas.merge(
+            vagas_abertas(df)[['Nº Processo', COLUNA_OCORRENCIA, 'LINHA DE CUIDADO', 'UNIDADE', 'FUNÇÃO',
+                               'Nivel', 'DATA ABERTURA DA VAGA', 'Status Vaga']],
+            on=['Nº Processo', COLUNA_OCORRENCIA], how='left'
+        ).drop(columns=COLUNA_OCORRENCIA)
+        df_antigas['DATA ABERTURA DA VAGA'] = df_antigas['DATA ABERTURA DA VAGA'].dt.strftime('%d/%m/%Y')
+        st.dataframe(df_antigas, hide_index=True, use_container_width=True)
+
 # Rodapé
 st.markdown("---")
 st.caption("📊 Dashboard de Indicadores RH")
\ No newline at end of file
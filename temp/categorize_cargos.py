@@ -1,64 +1,138 @@
+import os
+import re
+import sys
+
+import pandas as pd
+
+# Permite importar o pacote "dados" da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from categorizacao import CLASSIFICACAO_MANUAL, ArmazemCargos
+from dados import normalizar_serie
+
+NAO_CLASSIFICADO = "Não Classificado"
+
+# Regras em ordem de prioridade: vale a primeira faixa com alguma palavra-chave
+# contida no cargo. As palavras são comparadas sem acentos e em maiúsculas.
+REGRAS = [
+    # Casos ambíguos: ficam para classificação manual
+    (NAO_CLASSIFICADO, list(CLASSIFICACAO_MANUAL)),
+
+    # Hierarchical keywords
+    ("DIRETOR", ["DIRETOR"]),
+    ("GERENTE", ["GERENTE"]),
+    ("SUPERVISOR", ["SUPERVISOR", "SUPERINTENDENTE"]),
+    ("COORDENADOR", ["COORDENADOR", "COORD."]),
+    ("SUPERVISOR", ["LIDER"]),  # As per previous logic
+    ("ASSESSOR", ["ASSESSOR"]),
+
+    # Role-based keywords
+    ("MEDICOS", [
+        "MEDICO", "CIRURGIAO", "PSIQUIATRA", "PEDIATRA", "GINECOLOGISTA", "DERMATOLOGISTA",
+        "FISIATRA", "GERIATRA", "NEUROLOGISTA", "OFTALMOLOGISTA", "ORTOPEDISTA",
+        "REUMATOLOGISTA", "DENTISTA", "ODONTO",
+    ]),
+    ("ENFERMAGEM", ["ENFERMAGEM", "ENFERMEIR"]),
+    ("TÉCNICO", ["TECNICO", "TEC.", "TECNOLOGO"]),
+    ("APRENDIZ", ["APRENDIZ"]),
+
+    # Multidisciplinary and Administrative
+    ("ADMINISTRATIVO", [
+        "ANALISTA", "ASSISTENTE", "ADVOGADO", "COMPRADOR", "CONTROLLER", "ESCRITURARIO",
+        "FATURISTA", "SECRETARIA", "FINANCEIRO", "PESSOAL", "RH", "DP", "OUVIDORIA",
+        "ALMOXARIFE", "RECEPCIONISTA", "TESOUREIRO", "TELEFONISTA", "PATRIMONIO", "ADM",
+        "ADMINISTRADOR",
+    ]),
+    ("MULTIDISCIPLINAR", [
+        "FISIOTERAPEUTA", "FONOAUDIOLOGO", "PSICOLOGO", "NUTRICIONISTA", "SOCIAL",
+        "FARMACEUTICO", "BIOMEDICO", "BIOQUIMICO", "EDUCADOR FISICO", "TERAPEUTA OCUPACIONAL",
+        "MUSICOTERAPEUTA", "PSICOPEDAGOGO",
+    ]),
+
+    # Operational
+    ("OPERACIONAL", [
+        "ACOMPANHANTE", "AGENTE", "AJUDANTE", "ARQUIVISTA", "ATENDENTE", "AUXILIAR", "COPEIR",
+        "COSTUREIRA", "COZINHEIR", "CUIDADOR", "ENCARREGADO", "ESTAGIARIO", "FAXINEIR",
+        "INSTRUMENTADOR", "JARDINEIRO", "LIMPADOR", "MAQUEIRO", "MENSAGEIRO", "MERENDEIRA",
+        "MOTORISTA", "OFICIAL", "OPERADOR", "PORTEIRO", "RECREADOR", "ROUPEIRO", "SERVENTE",
+        "VIGIA", "CONTROLADOR", "MANUTENCAO",
+    ]),
+]
+
+# Uma alternação por faixa (as palavras são trechos, não palavras inteiras, como antes)
+REGRAS_COMPILADAS = [
+    (categoria, re.compile("|".join(re.escape(p) for p in sorted(palavras, key=len, reverse=True))))
+    for categoria, palavras in REGRAS
+]
+
+
+def classificar_cargos(cargos):
+    """
+    Classifica vários cargos de uma vez pelas regras
+
+    Cada faixa é aplicada numa única passada vetorizada sobre os cargos que
+    ainda não foram resolvidos por uma faixa anterior.
+
+    A comparação é feita sobre o texto sem acentos (normalizar_texto). Antes
+    era sobre cargo.upper(), com acentos, e as palavras-chave sem acento não
+    casavam com cargos acentuados: PSICÓLOGO, FARMACÊUTICO, BIOQUÍMICO,
+    TÉCNICO... ficavam sem regra ou caíam numa faixa posterior. Agora casam
+    com a faixa da palavra, o que muda a categoria sugerida desses cargos.
+
+    Args:
+        cargos: Lista (ou Series) de nomes de cargo
+
+    Returns:
+        Series indexada pelo cargo com a categoria ("Não Classificado" sem regra)
+    """
+    cargos = pd.Series(list(dict.fromkeys(cargos)), dtype=object)
+    textos = normalizar_serie(cargos.astype(str))
+    categorias = pd.Series(NAO_CLASSIFICADO, index=cargos.index, dtype=object)
+    pendentes = pd.Series(True, index=cargos.index)
+
+    for categoria, padrao in REGRAS_COMPILADAS:
+        if not pendentes.any():
+            break
+        acertos = textos[pendentes].str.contains(padrao)
+        acertos = acertos.index[acertos]
+        categorias[acertos] = categoria
+        pendentes[acertos] = False
+
+    categorias.index = cargos
+    return categorias
 
-import json
 
 def categorize_cargos(file_path):
     """
     Categoriza os cargos em um arquivo JSON com base em palavras-chave.
 
+    Só os cargos ainda "Não Classificado" são avaliados; as categorias já
+    definidas (inclusive as manuais do categorizador) são mantidas. As
+    classificações vão para o diário pelo ArmazemCargos, então valem mesmo
+    com o categorizador aberto e um cargo reclassificado por alguém durante
+    a execução não é sobrescrito.
+
     Args:
         file_path (str): O caminho para o arquivo JSON.
+
+    Returns:
+        int: Quantidade de cargos classificados nesta execução.
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        cargos_data = json.load(f)
-
-    categorized_data = {}
-    for cargo, old_category in cargos_data.items():
-        cargo_upper = cargo.upper()
-        new_category = "Não Classificado"
-
-        # Hierarchical keywords
-        if "DIRETOR" in cargo_upper:
-            new_category = "DIRETOR"
-        elif "GERENTE" in cargo_upper:
-            new_category = "GERENTE"
-        elif "SUPERVISOR" in cargo_upper or "SUPERINTENDENTE" in cargo_upper:
-            new_category = "SUPERVISOR"
-        elif "COORDENADOR" in cargo_upper or "COORD." in cargo_upper:
-            new_category = "COORDENADOR"
-        elif "LIDER" in cargo_upper:
-            new_category = "SUPERVISOR" # As per previous logic
-        elif "ASSESSOR" in cargo_upper:
-            new_category = "ASSESSOR"
-        
-        # Role-based keywords
-        elif "MEDICO" in cargo_upper or "MÉDICO" in cargo_upper or "CIRURGIAO" in cargo_upper or "PSIQUIATRA" in cargo_upper or "PEDIATRA" in cargo_upper or "GINECOLOGISTA" in cargo_upper or "DERMATOLOGISTA" in cargo_upper or "FISIATRA" in cargo_upper or "GERIATRA" in cargo_upper or "NEUROLOGISTA" in cargo_upper or "OFTALMOLOGISTA" in cargo_upper or "ORTOPEDISTA" in cargo_upper or "REUMATOLOGISTA" in cargo_upper or "DENTISTA" in cargo_upper or "ODONTO" in cargo_upper:
-            new_category = "MEDICOS"
-        elif "ENFERMAGEM" in cargo_upper or "ENFERMEIR" in cargo_upper:
-            new_category = "ENFERMAGEM"
-        elif "TECNICO" in cargo_upper or "TÉCNICO" in cargo_upper or "TEC." in cargo_upper or "TECNOLOGO" in cargo_upper:
-            new_category = "TÉCNICO"
-        elif "APRENDIZ" in cargo_upper:
-            new_category = "APRENDIZ"
-
-        # Multidisciplinary and Administrative
-        elif "ANALISTA" in cargo_upper or "ASSISTENTE" in cargo_upper or "ADVOGADO" in cargo_upper or "COMPRADOR" in cargo_upper or "CONTROLLER" in cargo_upper or "ESCRITURARIO" in cargo_upper or "FATURISTA" in cargo_upper or "SECRETARIA" in cargo_upper or "FINANCEIRO" in cargo_upper or "PESSOAL" in cargo_upper or "RH" in cargo_upper or "DP" in cargo_upper or "OUVIDORIA" in cargo_upper or "ALMOXARIFE" in cargo_upper or "RECEPCIONISTA" in cargo_upper or "TESOUREIRO" in cargo_upper or "TELEFONISTA" in cargo_upper or "PATRIMONIO" in cargo_upper or "ADM" in cargo_upper or "ADMINISTRADOR" in cargo_upper:
-            new_category = "ADMINISTRATIVO"
-        
-        elif "FISIOTERAPEUTA" in cargo_upper or "FONOAUDIOLOGO" in cargo_upper or "PSICOLOGO" in cargo_upper or "NUTRICIONISTA" in cargo_upper or "SOCIAL" in cargo_upper or "FARMACEUTICO" in cargo_upper or "BIOMEDICO" in cargo_upper or "BIOQUIMICO" in cargo_upper or "EDUCADOR FISICO" in cargo_upper or "TERAPEUTA OCUPACIONAL" in cargo_upper or "MUSICOTERAPEUTA" in cargo_upper or "PSICOPEDAGOGO" in cargo_upper:
-            new_category = "MULTIDISCIPLINAR"
-
-        # Operational
-        elif "ACOMPANHANTE" in cargo_upper or "AGENTE" in cargo_upper or "AJUDANTE" in cargo_upper or "ARQUIVISTA" in cargo_upper or "ATENDENTE" in cargo_upper or "AUXILIAR" in cargo_upper or "COPEIR" in cargo_upper or "COSTUREIRA" in cargo_upper or "COZINHEIR" in cargo_upper or "CUIDADOR" in cargo_upper or "ENCARREGADO" in cargo_upper or "ESTAGIARIO" in cargo_upper or "FAXINEIR" in cargo_upper or "INSTRUMENTADOR" in cargo_upper or "JARDINEIRO" in cargo_upper or "LIMPADOR" in cargo_upper or "MAQUEIRO" in cargo_upper or "MENSAGEIRO" in cargo_upper or "MERENDEIRA" in cargo_upper or "MOTORISTA" in cargo_upper or "OFICIAL" in cargo_upper or "OPERADOR" in cargo_upper or "PORTEIRO" in cargo_upper or "RECREADOR" in cargo_upper or "ROUPEIRO" in cargo_upper or "SERVENTE" in cargo_upper or "VIGIA" in cargo_upper or "CONTROLADOR" in cargo_upper or "MANUTENCAO" in cargo_upper:
-            new_category = "OPERACIONAL"
-
-        # Ambiguous cases
-        if "AUTONOMO" in cargo_upper or "Implantação" in cargo_upper:
-            new_category = "Não Classificado"
-
-        categorized_data[cargo] = new_category
-
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(categorized_data, f, ensure_ascii=False, indent=4)
+    # Pelo armazém: lê snapshot + diário e grava no diário sob a trava, como o categorizador
+    armazem = ArmazemCargos(file_path)
+    cargos_data, _, _ = armazem.copia()
+
+    pendentes = [cargo for cargo, categoria in cargos_data.items() if categoria == NAO_CLASSIFICADO]
+    novas = classificar_cargos(pendentes)
+    novas = novas[novas != NAO_CLASSIFICADO]
+    gravadas, conflitos = armazem.salvar(
+        {cargo: (NAO_CLASSIFICADO, categoria) for cargo, categoria in novas.items()}
+    )
+
+    print(f"{len(gravadas)} de {len(pendentes)} cargos não classificados foram categorizados.")
+    for cargo, _, _, atual in conflitos:
+        print(f"  ! {cargo}: classificado por outra pessoa como {atual} durante a execução (mantido)")
+    return len(gravadas)
 
 if __name__ == "__main__":
     categorize_cargos('cargos_niveis.json')
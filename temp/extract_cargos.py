@@ -1,6 +1,18 @@
 
-import pandas as pd
+import os
+import sys
 import json
+import argparse
+
+import pandas as pd
+
+# Permite importar o pacote "dados" da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from categorizacao import ArmazemCargos, trava_arquivo
+from dados import caminho_dados, ler_planilha, normalizar_serie
+
+from categorize_cargos import NAO_CLASSIFICADO, classificar_cargos
 
 def extract_cargos_from_excel(file_path):
     """
@@ -13,8 +25,8 @@ def extract_cargos_from_excel(file_path):
         list: Uma lista de cargos únicos.
     """
     try:
-        # Carregar a planilha, especificando o cabeçalho na linha 8 (índice 7)
-        df = pd.read_excel(file_path, header=7)
+        # Carregar só a coluna Cargo (linha do cabeçalho detectada automaticamente)
+        df = ler_planilha(file_path, colunas=['Cargo'])
         
         # Verificar se a coluna 'Cargo' existe
         if 'Cargo' in df.columns:
@@ -28,18 +40,64 @@ def extract_cargos_from_excel(file_path):
     except Exception as e:
         return f"Ocorreu um erro: {e}"
 
+def mesclar_cargos(cargos, arquivo_json, classificar=False, recriar=False):
+    """
+    Acrescenta ao mapeamento só os cargos que ainda não estão nele
+
+    A comparação ignora acentos, caixa e espaços extras, então variações de
+    um cargo já mapeado não viram entradas novas. As categorias existentes
+    não são alteradas.
+
+    Args:
+        cargos (list): Cargos extraídos da planilha.
+        arquivo_json (str): Caminho do cargos_niveis.json.
+        classificar (bool): Pré-classificar os novos cargos pelas regras de palavras-chave.
+        recriar (bool): Descartar o mapeamento atual (tudo volta a "Não Classificado");
+            o diário pendente vai para o histórico antes da troca.
+
+    Returns:
+        dict: Os cargos acrescentados, com a categoria atribuída.
+    """
+    with trava_arquivo(arquivo_json):
+        if not os.path.exists(arquivo_json):
+            with open(arquivo_json, 'w', encoding='utf-8') as f:
+                json.dump({}, f)
+    # Pelo armazém: snapshot + diário, gravação sob a trava, como o categorizador
+    armazem = ArmazemCargos(arquivo_json)
+    mapeamento = {} if recriar else armazem.copia()[0]
+
+    conhecidos = set(normalizar_serie(pd.Series(list(mapeamento), dtype=object)))
+    candidatos = pd.Series(cargos, dtype=object)
+    chaves = normalizar_serie(candidatos)
+    novos = list(dict.fromkeys(candidatos[~chaves.isin(conhecidos) & ~chaves.duplicated()]))
+
+    if classificar:
+        adicionados = classificar_cargos(novos).to_dict()
+    else:
+        adicionados = {cargo: NAO_CLASSIFICADO for cargo in novos}
+
+    if recriar:
+        armazem.substituir(adicionados)
+        return adicionados
+    # Cargos novos entram pelo diário; um que outra sessão acrescentou no meio tempo é mantido
+    gravadas, _ = armazem.salvar({cargo: (None, categoria) for cargo, categoria in adicionados.items()})
+    return {cargo: para for cargo, _, para in gravadas}
+
 if __name__ == "__main__":
-    caminho_arquivo = 'oris.xlsx'
-    cargos = extract_cargos_from_excel(caminho_arquivo)
+    parser = argparse.ArgumentParser(description="Acrescentar ao cargos_niveis.json os cargos novos da planilha")
+    parser.add_argument('arquivo', nargs='?', default=caminho_dados('oris.xlsx'), help="Planilha com a coluna Cargo (padrão: oris.xlsx)")
+    parser.add_argument('--mapeamento', default='cargos_niveis.json', help="Arquivo de mapeamento (padrão: cargos_niveis.json)")
+    parser.add_argument('--classificar', action='store_true', help="Pré-classificar os cargos novos pelas regras de palavras-chave")
+    parser.add_argument('--recriar', action='store_true', help="Descartar o mapeamento atual e recriá-lo do zero")
+    args = parser.parse_args()
+
+    cargos = extract_cargos_from_excel(args.arquivo)
     
     if isinstance(cargos, list):
-        # Criar o dicionário para o JSON
-        cargos_mapeados = {cargo: "Não Classificado" for cargo in cargos}
-        
-        # Salvar em um arquivo JSON
-        with open('cargos_niveis.json', 'w', encoding='utf-8') as f:
-            json.dump(cargos_mapeados, f, ensure_ascii=False, indent=4)
-        
-        print(f"{len(cargos)} cargos únicos foram extraídos e salvos em 'cargos_niveis.json'.")
+        adicionados = mesclar_cargos(cargos, args.mapeamento, classificar=args.classificar, recriar=args.recriar)
+
+        print(f"{len(cargos)} cargos únicos na planilha; {len(adicionados)} novos acrescentados a '{args.mapeamento}'.")
+        for cargo, categoria in sorted(adicionados.items()):
+            print(f"  + {cargo} -> {categoria}")
     else:
         print(cargos)
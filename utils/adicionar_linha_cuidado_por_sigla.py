@@ -2,9 +2,15 @@ import os
 import re
 import sys
 import json
+import argparse
 import sqlite3
 import pandas as pd
 
+# Permite importar o pacote "dados" da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados import caminho_dados, nome_canonico
+
 # Linhas de cuidado padrão
 LINHAS_CUIDADO = [
     "URGENCIA E EMERGENCIA",
@@ -14,9 +20,24 @@ LINHAS_CUIDADO = [
     "PROGRAMAS",
 ]
 
-DB_FILE = 'oris.db'
+DB_FILE = caminho_dados('oris.db')
 TABLE_NAME = 'oris'
 MAPPING_FILE = 'mappings_nome_fantasia.json'
+COLUNA_LINHA = 'Linha de cuidado'
+NAO_DEFINIDO = 'NÃO DEFINIDO'
+REVIEW_FILE = 'nomes_fantasia_pendentes.csv'
+TABELA_MAPA = 'mapa_linha_cuidado'  # mapeamento já aplicado no banco
+
+
+# Siglas-chave em ordem de prioridade: se o nome tiver mais de uma, vale a primeira da lista
+REGRAS_SIGLA = [
+    ('UBS', 'APS'),
+    ('CAPS', 'SAUDE MENTAL'),
+    ('UPA', 'URGENCIA E EMERGENCIA'),
+    ('PAI', 'SAUDE DO IDOSO'),
+]
+PRIORIDADE_SIGLA = {sigla: (i, linha) for i, (sigla, linha) in enumerate(REGRAS_SIGLA)}
+PADRAO_SIGLAS = re.compile(r'\b(' + '|'.join(re.escape(s) for s, _ in REGRAS_SIGLA) + r')\b')
 
 
 def aplicar_regras_automaticas_nome(nome):
@@ -25,31 +46,28 @@ def aplicar_regras_automaticas_nome(nome):
     """
     if pd.isna(nome) or nome == '':
         return None
-    texto = str(nome).upper()
-    if re.search(r"\bUBS\b", texto):
-        return 'APS'
-    if re.search(r"\bCAPS\b", texto):
-        return 'SAUDE MENTAL'
-    if re.search(r"\bUPA\b", texto):
-        return 'URGENCIA E EMERGENCIA'
-    if re.search(r"\bPAI\b", texto):
-        return 'SAUDE DO IDOSO'
-    return None
-
-
-def carregar_mapeamento():
-    if os.path.exists(MAPPING_FILE):
+    siglas = PADRAO_SIGLAS.findall(str(nome).upper())
+    if not siglas:
+        return None
+    return min(PRIORIDADE_SIGLA[s] for s in siglas)[1]
+
+
+def carregar_mapeamento(arquivo=MAPPING_FILE):
+    if os.path.exists(arquivo):
         try:
-            with open(MAPPING_FILE, 'r', encoding='utf-8') as f:
+            with open(arquivo, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception:
             return {}
     return {}
 
 
-def salvar_mapeamento(mapping):
-    with open(MAPPING_FILE, 'w', encoding='utf-8') as f:
+def salvar_mapeamento(mapping, arquivo=MAPPING_FILE):
+    # grava ao lado e troca de uma vez: uma execução interrompida não corrompe o arquivo
+    tmp = arquivo + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
         json.dump(mapping, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, arquivo)
 
 
 def perguntar_linha_para_nome(nome, mapping):
@@ -93,85 +111,169 @@ def perguntar_linha_para_nome(nome, mapping):
         print('Entrada inválida. Tente novamente.')
 
 
+def colunas_tabela(conn, tabela=TABLE_NAME):
+    """Mapeia o nome canônico de cada coluna da tabela para o nome gravado no banco."""
+    info = conn.execute(f'PRAGMA table_info("{tabela}")').fetchall()
+    return {nome_canonico(linha[1], 'oris'): linha[1] for linha in info}
+
+
+def aplicar_mapeamento_sql(conn, nome_col, linhas, nova_col=COLUNA_LINHA, tabela=TABLE_NAME):
+    """Grava `linhas` (Nome Fantasia -> Linha de cuidado) direto no banco.
+
+    O mapeamento já aplicado fica na tabela pequena `TABELA_MAPA`; só os nomes
+    cujo valor mudou vão para uma tabela temporária, aplicada com um único
+    UPDATE ... FROM apoiado no índice de Nome Fantasia. Linhas que já têm o
+    valor certo não são reescritas. Retorna a quantidade de linhas alteradas.
+    """
+    with conn:
+        if nova_col not in colunas_tabela(conn, tabela).values():
+            conn.execute(f'ALTER TABLE "{tabela}" ADD COLUMN "{nova_col}" TEXT')
+            conn.execute(f'DROP TABLE IF EXISTS "{TABELA_MAPA}"')  # coluna nova: aplicar tudo
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_nome_fantasia ON "{tabela}" ("{nome_col}")')
+        conn.execute(f'CREATE TABLE IF NOT EXISTS "{TABELA_MAPA}" (nome TEXT PRIMARY KEY, linha TEXT NOT NULL)')
+
+        aplicado = dict(conn.execute(f'SELECT nome, linha FROM "{TABELA_MAPA}"'))
+        mudancas = [(nome, linha) for nome, linha in linhas.items() if aplicado.get(nome) != linha]
+
+        conn.execute('DROP TABLE IF EXISTS temp.mapa_mudancas')
+        conn.execute('CREATE TEMP TABLE mapa_mudancas (nome TEXT PRIMARY KEY, linha TEXT)')
+        conn.executemany('INSERT INTO mapa_mudancas VALUES (?, ?)', mudancas)
+        # Estatísticas da tabela temporária: o planejador percorre as mudanças e usa o índice da tabela grande
+        conn.execute('ANALYZE temp.mapa_mudancas')
+
+        if sqlite3.sqlite_version_info >= (3, 33, 0):
+            cur = conn.execute(f'''
+                UPDATE "{tabela}" SET "{nova_col}" = m.linha
+                FROM mapa_mudancas AS m
+                WHERE "{tabela}"."{nome_col}" = m.nome
+                  AND "{tabela}"."{nova_col}" IS NOT m.linha
+            ''')
+        else:  # SQLite sem UPDATE ... FROM: subconsulta correlacionada equivalente
+            cur = conn.execute(f'''
+                UPDATE "{tabela}" SET "{nova_col}" = (
+                    SELECT linha FROM mapa_mudancas WHERE nome = "{tabela}"."{nome_col}"
+                )
+                WHERE "{nome_col}" IN (SELECT nome FROM mapa_mudancas)
+                  AND "{nova_col}" IS NOT (
+                    SELECT linha FROM mapa_mudancas WHERE nome = "{tabela}"."{nome_col}"
+                )
+            ''')
+        alteradas = cur.rowcount
+
+        # Linhas sem Nome Fantasia não têm como ser classificadas
+        cur = conn.execute(f'''
+            UPDATE "{tabela}" SET "{nova_col}" = ?
+            WHERE ("{nome_col}" IS NULL OR "{nome_col}" = '') AND "{nova_col}" IS NOT ?
+        ''', (NAO_DEFINIDO, NAO_DEFINIDO))
+        alteradas += cur.rowcount
+
+        conn.executemany(f'INSERT OR REPLACE INTO "{TABELA_MAPA}" VALUES (?, ?)', mudancas)
+        conn.execute('DROP TABLE temp.mapa_mudancas')
+    return alteradas
+
+
+def classificar_lote(nomes, mapping):
+    """Classifica todos os nomes de uma vez, sem interação.
+
+    As regras de sigla têm precedência (como no modo interativo); depois vale
+    o que já estiver em `mapping`. Retorna (resolvidos, pendentes), com os
+    nomes sem regra nem mapeamento em `pendentes`.
+    """
+    resolvidos, pendentes = {}, []
+    for nome in nomes:
+        linha = aplicar_regras_automaticas_nome(nome) or mapping.get(nome)
+        if linha:
+            resolvidos[nome] = linha
+        else:
+            pendentes.append(nome)
+    return resolvidos, pendentes
+
+
+def salvar_revisao(pendentes, contagens, arquivo=REVIEW_FILE):
+    """Grava os nomes sem linha de cuidado (com a quantidade de linhas) para revisão manual."""
+    revisao = pd.DataFrame(
+        {'Nome Fantasia': pendentes, 'Linhas': [contagens.get(n, 0) for n in pendentes]}
+    ).sort_values(['Linhas', 'Nome Fantasia'], ascending=[False, True])
+    tmp = arquivo + '.tmp'
+    revisao.to_csv(tmp, index=False, encoding='utf-8-sig')
+    os.replace(tmp, arquivo)
+
+
 def main():
-    print('Carregando banco de dados...')
-    if not os.path.exists(DB_FILE):
-        print(f"Erro: '{DB_FILE}' não encontrado. Execute 'transformar_excel_sqlite.py' primeiro.")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Preencher a coluna 'Linha de cuidado' a partir do Nome Fantasia")
+    parser.add_argument('--lote', action='store_true',
+                        help='Modo não interativo (cron): nomes sem regra nem mapeamento vão para o arquivo de revisão')
+    parser.add_argument('--banco', default=DB_FILE, help='Banco SQLite (padrão: oris.db)')
+    parser.add_argument('--mapeamento', default=MAPPING_FILE, help=f'Mapeamento Nome Fantasia -> Linha (padrão: {MAPPING_FILE})')
+    parser.add_argument('--revisao', default=REVIEW_FILE, help=f'Arquivo CSV de nomes pendentes (padrão: {REVIEW_FILE})')
+    args = parser.parse_args()
 
-    conn = sqlite3.connect(DB_FILE)
-    df = pd.read_sql(f"SELECT * FROM {TABLE_NAME}", conn)
-    conn.close()
-
-    # localizar coluna Nome Fantasia
-    nome_col = None
-    for col in df.columns:
-        if col.lower().strip() in ('nome fantasia', 'nome_fantasia'):
-            nome_col = col
-            break
-    if not nome_col:
-        print("Erro: coluna 'Nome Fantasia' não encontrada. Colunas disponíveis:")
-        for col in df.columns:
-            print(' -', col)
+    print('Carregando banco de dados...')
+    if not os.path.exists(args.banco):
+        print(f"Erro: '{args.banco}' não encontrado. Execute 'transformar_excel_sqlite.py' primeiro.")
         sys.exit(1)
 
-    print(f"Coluna usada: '{nome_col}'")
-
-    nomes_unicos = [n for n in df[nome_col].astype(str).fillna('').unique() if n != '']
-    print(f"Total de nomes fantasia únicos: {len(nomes_unicos)}")
-
-    mapping = carregar_mapeamento()
-
-    resultados_auto = []
-    resultados_inter = []
-
-    for nome in sorted(nomes_unicos):
-        # tentar regra automática
-        linha_auto = aplicar_regras_automaticas_nome(nome)
-        if linha_auto:
-            mapping[nome] = linha_auto
-            resultados_auto.append((nome, linha_auto))
-            print(f"Auto: {nome} -> {linha_auto}")
-            continue
-        # se já mapeado, pular
-        if nome in mapping:
-            continue
-        # perguntar
-        linha = perguntar_linha_para_nome(nome, mapping)
-        resultados_inter.append((nome, linha))
-
-    # salvar mapeamento
-    salvar_mapeamento(mapping)
-    print(f"\n✓ Mapeamento salvo em '{MAPPING_FILE}'")
-
-    # aplicar ao DataFrame
-    nova_col = 'Linha de cuidado'
-    def obter(nome):
-        if nome in mapping:
-            return mapping[nome]
-        auto = aplicar_regras_automaticas_nome(nome)
-        return auto if auto else 'NÃO DEFINIDO'
-
-    df[nova_col] = df[nome_col].astype(str).map(obter)
-
-    # reordenar para inserir após Nome Fantasia
-    cols = list(df.columns)
+    conn = sqlite3.connect(args.banco)
     try:
-        idx = cols.index(nome_col)
-        if nova_col in cols:
-            cols.remove(nova_col)
-        cols.insert(idx + 1, nova_col)
-        df = df[cols]
-    except ValueError:
-        pass
-
-    # salvar no DB
-    conn = sqlite3.connect(DB_FILE)
-    df.to_sql(TABLE_NAME, conn, index=False, if_exists='replace')
-    conn.close()
-
-    print(f"\n✓ Banco atualizado: {DB_FILE} (tabela: {TABLE_NAME})")
-    print(f"Linhas: {len(df)} | Colunas: {len(df.columns)}")
+        # cabeçalhos comparados pelo nome canônico ('nome_fantasia' -> 'Nome Fantasia')
+        colunas = colunas_tabela(conn)
+        nome_col = colunas.get('Nome Fantasia')
+        if not nome_col:
+            print("Erro: coluna 'Nome Fantasia' não encontrada. Colunas disponíveis:")
+            for col in colunas.values():
+                print(' -', col)
+            sys.exit(1)
+        nova_col = colunas.get(COLUNA_LINHA, COLUNA_LINHA)
+
+        print(f"Coluna usada: '{nome_col}'")
+
+        # Só os valores distintos saem do banco (o índice de Nome Fantasia atende a consulta)
+        contagens = {
+            str(n): qtd
+            for n, qtd in conn.execute(
+                f'SELECT "{nome_col}", COUNT(*) FROM "{TABLE_NAME}" GROUP BY "{nome_col}"'
+            )
+            if n is not None and str(n) != ''
+        }
+        nomes_unicos = sorted(contagens)
+        print(f"Total de nomes fantasia únicos: {len(nomes_unicos)}")
+
+        mapping = carregar_mapeamento(args.mapeamento)
+
+        if args.lote:
+            resolvidos, pendentes = classificar_lote(nomes_unicos, mapping)
+            mapping.update(resolvidos)
+            salvar_revisao(pendentes, contagens, args.revisao)
+            print(f"Classificados: {len(resolvidos)} | Pendentes: {len(pendentes)}")
+            if pendentes:
+                print(f"⚠ Nomes pendentes gravados em '{args.revisao}' (ficam como '{NAO_DEFINIDO}')")
+        else:
+            for nome in nomes_unicos:
+                # tentar regra automática
+                linha_auto = aplicar_regras_automaticas_nome(nome)
+                if linha_auto:
+                    mapping[nome] = linha_auto
+                    print(f"Auto: {nome} -> {linha_auto}")
+                    continue
+                # se já mapeado, pular
+                if nome in mapping:
+                    continue
+                # perguntar
+                perguntar_linha_para_nome(nome, mapping)
+
+        # salvar mapeamento
+        salvar_mapeamento(mapping, args.mapeamento)
+        print(f"\n✓ Mapeamento salvo em '{args.mapeamento}'")
+
+        # aplicar no banco, sem reescrever a tabela
+        linhas = {nome: mapping.get(nome, NAO_DEFINIDO) for nome in nomes_unicos}
+        alteradas = aplicar_mapeamento_sql(conn, nome_col, linhas, nova_col)
+        total = conn.execute(f'SELECT COUNT(*) FROM "{TABLE_NAME}"').fetchone()[0]
+    finally:
+        conn.close()
+
+    print(f"\n✓ Banco atualizado: {args.banco} (tabela: {TABLE_NAME}, coluna: '{nova_col}')")
+    print(f"Linhas: {total} | Linhas alteradas: {alteradas}")
 
 
 if __name__ == '__main__':
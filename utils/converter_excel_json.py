@@ -1,67 +1,108 @@
 """
 Script para converter planilha Excel para JSON
-Uso: python converter_excel_json.py
+Uso: python converter_excel_json.py [--formato json|jsonl] [--gzip] [entrada.xlsx] [saida]
+
+A planilha é lida em blocos e cada registro é gravado assim que o bloco é
+convertido, então a memória usada não depende da quantidade de registros.
 """
 
-import pandas as pd
+import os
+import sys
+import gzip
 import json
+import argparse
+
+# Permite importar o pacote "dados" da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados import COLUNAS_DATA_ORIS, caminho_dados, converter_data, ler_blocos
+
+TAMANHO_BLOCO = 5000
+
+
+def registros_do_bloco(bloco):
+    """Converte um bloco em dicionários prontos para JSON (datas DD/MM/YYYY, vazios como null)"""
+    for col in COLUNAS_DATA_ORIS:
+        if col in bloco.columns:
+            bloco[col] = converter_data(bloco[col]).dt.strftime("%d/%m/%Y")
+    bloco = bloco.astype(object).where(bloco.notna(), None)
+    return bloco.to_dict(orient="records")
 
 
-def converter_excel_para_json(arquivo_excel, arquivo_json_saida):
+def converter_excel_para_json(arquivo_excel, arquivo_json_saida, formato="json", tamanho_bloco=TAMANHO_BLOCO):
     """
     Converte arquivo Excel para JSON no formato esperado pelo dashboard
 
     Args:
-        arquivo_excel: Caminho do arquivo Excel (.xlsx ou .xls)
-        arquivo_json_saida: Caminho do arquivo JSON de saída
+        arquivo_excel: Caminho do arquivo Excel (.xlsx)
+        arquivo_json_saida: Caminho do arquivo de saída (terminado em .gz = compactado com gzip)
+        formato: "json" (lista de registros) ou "jsonl" (um registro por linha)
+        tamanho_bloco: Linhas lidas da planilha por vez
+
+    Returns:
+        Quantidade de registros gravados
     """
+    if not os.path.exists(arquivo_excel):
+        raise FileNotFoundError(arquivo_excel)
+
+    print(f"📖 Lendo arquivo Excel em blocos de {tamanho_bloco} linhas: {arquivo_excel}")
+
+    abrir = gzip.open if arquivo_json_saida.endswith(".gz") else open
+    temporario = arquivo_json_saida + ".tmp"
+    total, bytes_escritos = 0, 0
 
-    print(f"📖 Lendo arquivo Excel: {arquivo_excel}")
-
-    # Ler Excel
-    df = pd.read_excel(arquivo_excel)
-
-    print(f"✅ {len(df)} registros encontrados")
-    print(f"📊 Colunas: {', '.join(df.columns.tolist())}")
-
-    # Converter datas para string no formato DD/MM/YYYY
-    date_columns = [
-        "Dt Admissão",
-        "Dt Rescisão",
-        "Dt Nascimento",
-        "Dt Início Cargo",
-        "Dt Início Centro de Custo",
-        "Dt Início Empresa",
-        "Dt Início Escala",
-        "Dt Início Local de Trabalho",
-        "Dt Início Situação",
-        "Dt Início Tipo Funcionário",
-    ]
-
-    for col in date_columns:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
-            df[col] = df[col].dt.strftime("%d/%m/%Y")
-            df[col] = df[col].replace("NaT", None)
-
-    # Converter para JSON
-    dados_json = df.to_dict(orient="records")
-
-    # Salvar arquivo
-    with open(arquivo_json_saida, "w", encoding="utf-8") as f:
-        json.dump(dados_json, f, ensure_ascii=False, indent=2)
+    def escrever(f, texto):
+        nonlocal bytes_escritos
+        dados = texto.encode("utf-8")
+        f.write(dados)
+        bytes_escritos += len(dados)
 
+    try:
+        with abrir(temporario, "wb") as f:
+            if formato == "json":
+                escrever(f, "[")
+            for bloco in ler_blocos(arquivo_excel, tamanho_bloco=tamanho_bloco):
+                if total == 0:
+                    print(f"📊 Colunas: {', '.join(bloco.columns.tolist())}")
+                for registro in registros_do_bloco(bloco):
+                    linha = json.dumps(registro, ensure_ascii=False, default=str)
+                    if formato == "json":
+                        escrever(f, ("\n  " if total == 0 else ",\n  ") + linha)
+                    else:
+                        escrever(f, linha + "\n")
+                    total += 1
+            if formato == "json":
+                escrever(f, "\n]\n" if total else "]\n")
+        os.replace(temporario, arquivo_json_saida)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+    print(f"✅ {total} registros gravados")
     print(f"✅ Arquivo JSON criado: {arquivo_json_saida}")
-    print(f"📁 Tamanho: {len(json.dumps(dados_json))/1024:.2f} KB")
+    tamanho = f"📁 Tamanho: {bytes_escritos / 1024:.2f} KB"
+    if abrir is gzip.open:
+        tamanho += f" ({os.path.getsize(arquivo_json_saida) / 1024:.2f} KB compactado)"
+    print(tamanho)
+    return total
 
 
 if __name__ == "__main__":
-    # CONFIGURE AQUI OS CAMINHOS DOS ARQUIVOS
-    arquivo_entrada = "oris_selecionado.xlsx"  # Seu arquivo Excel
-    arquivo_saida = "dados_colaboradores.json"  # Arquivo JSON de saída
+    parser = argparse.ArgumentParser(description="Converter a planilha do oris para JSON")
+    parser.add_argument("entrada", nargs="?", default=caminho_dados("oris_selecionado.xlsx"), help="Arquivo Excel")
+    parser.add_argument("saida", nargs="?", help="Arquivo de saída (padrão: dados_colaboradores.json/.jsonl)")
+    parser.add_argument("--formato", choices=["json", "jsonl"], default="json", help="Lista JSON ou JSON Lines")
+    parser.add_argument("--gzip", action="store_true", help="Compactar a saída com gzip (.gz)")
+    args = parser.parse_args()
+
+    arquivo_entrada = args.entrada  # Seu arquivo Excel
+    arquivo_saida = args.saida or caminho_dados(f"dados_colaboradores.{args.formato}")  # Arquivo JSON de saída
+    if args.gzip and not arquivo_saida.endswith(".gz"):
+        arquivo_saida += ".gz"
 
     try:
-        converter_excel_para_json(arquivo_entrada, arquivo_saida)
+        converter_excel_para_json(arquivo_entrada, arquivo_saida, args.formato)
         print("\n🎉 Conversão concluída com sucesso!")
         print(
             f"Agora você pode fazer upload do arquivo '{arquivo_saida}' no dashboard."
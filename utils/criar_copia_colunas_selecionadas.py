@@ -1,6 +1,18 @@
-import pandas as pd
 import re
 import os
+import sys
+import argparse
+import itertools
+
+import pandas as pd
+from openpyxl import Workbook
+
+# Permite importar o pacote "dados" da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados import COLUNAS_DATA_ORIS, caminho_dados, converter_data, ler_blocos, nome_canonico
+
+TAMANHO_BLOCO = 5000
 
 
 def extrair_colunas_do_md(arquivo_md):
@@ -22,8 +34,135 @@ def extrair_colunas_do_md(arquivo_md):
     return colunas_sim
 
 
-def criar_copia_selecionada(arquivo_origem, arquivo_md, arquivo_destino):
-    """Cria uma cópia do Excel com apenas as colunas selecionadas."""
+def escrever_xlsx(colunas, blocos, arquivo_destino):
+    """Grava os blocos linha a linha num workbook write-only; retorna o total de linhas."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(colunas)
+    total = 0
+    for bloco in blocos:
+        bloco = bloco[colunas].astype(object)
+        for linha in bloco.where(bloco.notna(), None).itertuples(index=False, name=None):
+            ws.append(linha)
+        total += len(bloco)
+    wb.save(arquivo_destino)
+    return total
+
+
+def _numerico(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _texto(v):
+    """Texto de uma célula (5.0 de uma coluna numérica alargada volta a ser '5')"""
+    if pd.isna(v):
+        return None
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def tipo_coluna(serie, atual=None):
+    """
+    Tipo mais estreito que guarda todos os valores da série sem perda, nunca abaixo de `atual`
+
+    Os tipos só alargam: "inteiro" -> "decimal" -> "texto" e "data" -> "texto".
+    """
+    valores = serie.dropna()
+    if atual == "texto":
+        return "texto"
+    if atual == "data" or (atual is None and serie.name in COLUNAS_DATA_ORIS):
+        convertida = converter_data(valores)
+        return "texto" if convertida.isna().any() else "data"
+    if not len(valores):
+        return atual or "texto"
+    if not valores.map(_numerico).all():
+        return "texto"
+    if atual == "decimal" or not valores.map(lambda v: float(v).is_integer()).all():
+        return "decimal"
+    return "inteiro"
+
+
+def converter_coluna(serie, tipo):
+    """Converte a série para o tipo escolhido por tipo_coluna (sem descartar valores)"""
+    if tipo == "data":
+        return converter_data(serie)
+    if tipo == "inteiro":
+        return pd.to_numeric(serie).astype("Int64")
+    if tipo == "decimal":
+        return pd.to_numeric(serie).astype("float64")
+    return serie.astype(object).map(_texto)
+
+
+def escrever_parquet(colunas, blocos, arquivo_destino):
+    """Grava os blocos num arquivo Parquet, um row group por bloco; retorna o total de linhas.
+
+    O tipo de cada coluna sai do primeiro bloco: datas viram timestamp,
+    colunas só com inteiros (ID, Nº Processo) viram int64 (vazios como nulo),
+    colunas com números fracionários viram float e o resto texto. Se um bloco
+    seguinte traz um valor que não cabe (texto numa coluna numérica, fração
+    numa de inteiros, data inválida), a coluna é alargada e os row groups já
+    gravados são regravados no tipo novo: nenhum valor vira vazio.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Saída Parquet requer o pacote 'pyarrow' (pip install pyarrow)")
+
+    tipos_arrow = {
+        "inteiro": pa.int64(),
+        "decimal": pa.float64(),
+        "data": pa.timestamp("ns"),
+        "texto": pa.string(),
+    }
+
+    def esquema(tipos):
+        return pa.schema([(col, tipos_arrow[tipos[col]]) for col in colunas])
+
+    def tabela(bloco, tipos):
+        bloco = bloco.assign(**{col: converter_coluna(bloco[col], tipos[col]) for col in colunas})
+        return pa.Table.from_pandas(bloco, schema=esquema(tipos), preserve_index=False)
+
+    def alargar(tipos):
+        """Reabre o arquivo no esquema novo, regravando os row groups já escritos"""
+        anterior = arquivo_destino + ".anterior"
+        os.replace(arquivo_destino, anterior)
+        try:
+            escritor = pq.ParquetWriter(arquivo_destino, esquema(tipos))
+            gravado = pq.ParquetFile(anterior)
+            for i in range(gravado.num_row_groups):
+                escritor.write_table(tabela(gravado.read_row_group(i).to_pandas(), tipos))
+            del gravado
+        finally:
+            os.remove(anterior)
+        return escritor
+
+    escritor, tipos, total = None, {}, 0
+    try:
+        for bloco in blocos:
+            bloco = bloco[colunas]
+            novos = {col: tipo_coluna(bloco[col], tipos.get(col)) for col in colunas}
+            alargadas = [col for col in colunas if tipos and novos[col] != tipos[col]]
+            tipos = novos
+            if escritor is None:
+                escritor = pq.ParquetWriter(arquivo_destino, esquema(tipos))
+            elif alargadas:
+                print(f"  ↳ Colunas alargadas para caber os novos valores: {', '.join(alargadas)}")
+                escritor.close()
+                escritor = None  # o finally não fecha de novo se alargar() falhar
+                escritor = alargar(tipos)
+
+            escritor.write_table(tabela(bloco, tipos))
+            total += len(bloco)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return total
+
+
+def criar_copia_selecionada(arquivo_origem, arquivo_md, arquivo_destino, tamanho_bloco=TAMANHO_BLOCO):
+    """Cria uma cópia do Excel com apenas as colunas selecionadas (.xlsx ou .parquet, pela extensão)."""
     print(f"Lendo arquivo de seleção: {arquivo_md}")
     colunas_selecionadas = extrair_colunas_do_md(arquivo_md)
 
@@ -35,40 +174,52 @@ def criar_copia_selecionada(arquivo_origem, arquivo_md, arquivo_destino):
     for col in colunas_selecionadas:
         print(f"  ✓ {col}")
 
-    print(f"\nLendo arquivo original: {arquivo_origem}")
-    # Ler o Excel com cabeçalho na linha 8
-    df = pd.read_excel(arquivo_origem, header=7)
-
-    print(f"Total de colunas no arquivo original: {len(df.columns)}")
-    print(f"Total de linhas no arquivo original: {len(df)}")
+    print(f"\nLendo arquivo original em blocos de {tamanho_bloco} linhas: {arquivo_origem}")
+    # Só as colunas selecionadas são extraídas de cada linha (cabeçalho detectado automaticamente)
+    blocos = ler_blocos(arquivo_origem, colunas=colunas_selecionadas, tamanho_bloco=tamanho_bloco)
+    primeiro = next(blocos)
 
     # Validar se todas as colunas existem no arquivo
-    colunas_nao_encontradas = [c for c in colunas_selecionadas if c not in df.columns]
+    canonicas = {c: nome_canonico(c, "oris") for c in colunas_selecionadas}
+    colunas_nao_encontradas = [c for c in colunas_selecionadas if canonicas[c] not in primeiro.columns]
     if colunas_nao_encontradas:
-        print(f"\n⚠️ Aviso: As seguintes colunas não foram encontradas:")
+        print("\n⚠️ Aviso: As seguintes colunas não foram encontradas:")
         for col in colunas_nao_encontradas:
             print(f"  - {col}")
-        # Remover colunas não encontradas
-        colunas_selecionadas = [c for c in colunas_selecionadas if c in df.columns]
-        print(f"\nContinuando com {len(colunas_selecionadas)} colunas válidas...")
-
-    # Filtrar apenas as colunas selecionadas
-    df_filtrado = df[colunas_selecionadas]
+    # Ordem do colunas_db.md, sem as não encontradas
+    colunas = list(dict.fromkeys(canonicas[c] for c in colunas_selecionadas if canonicas[c] in primeiro.columns))
+    if colunas_nao_encontradas:
+        print(f"\nContinuando com {len(colunas)} colunas válidas...")
 
-    # Salvar em novo arquivo Excel
     print(f"\nCriando arquivo de destino: {arquivo_destino}")
-    df_filtrado.to_excel(arquivo_destino, index=False)
-
-    print(f"\n✓ Arquivo criado com sucesso!")
-    print(f"  Colunas: {len(df_filtrado.columns)}")
-    print(f"  Linhas: {len(df_filtrado)}")
+    escrever = escrever_parquet if arquivo_destino.endswith(".parquet") else escrever_xlsx
+    # Grava ao lado e troca no fim: o destino atual continua válido se algo falhar
+    temporario = arquivo_destino + ".tmp"
+    try:
+        total = escrever(colunas, itertools.chain([primeiro], blocos), temporario)
+        os.replace(temporario, arquivo_destino)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+    print("\n✓ Arquivo criado com sucesso!")
+    print(f"  Colunas: {len(colunas)}")
+    print(f"  Linhas: {total}")
     print(f"  Arquivo: {arquivo_destino}")
 
 
 def main():
-    arquivo_md = "colunas_db.md"
-    arquivo_origem = "oris.xlsx"
-    arquivo_destino = "oris_selecionado.xlsx"
+    parser = argparse.ArgumentParser(description="Copiar do oris.xlsx só as colunas marcadas em colunas_db.md")
+    parser.add_argument("--origem", default=caminho_dados("oris.xlsx"), help="Planilha original (padrão: oris.xlsx)")
+    parser.add_argument("--destino", help="Arquivo de saída .xlsx ou .parquet (padrão: oris_selecionado.xlsx)")
+    parser.add_argument("--parquet", action="store_true", help="Gravar oris_selecionado.parquet em vez de .xlsx")
+    args = parser.parse_args()
+
+    arquivo_md = os.path.join(os.path.dirname(os.path.abspath(__file__)), "colunas_db.md")
+    arquivo_origem = args.origem
+    arquivo_destino = args.destino or caminho_dados(
+        "oris_selecionado.parquet" if args.parquet else "oris_selecionado.xlsx"
+    )
 
     # Verificar se arquivos existem
     if not os.path.exists(arquivo_md):
@@ -78,7 +229,10 @@ def main():
         print(f"Erro: Arquivo '{arquivo_origem}' não encontrado.")
         return
 
-    criar_copia_selecionada(arquivo_origem, arquivo_md, arquivo_destino)
+    try:
+        criar_copia_selecionada(arquivo_origem, arquivo_md, arquivo_destino)
+    except RuntimeError as e:
+        print(f"Erro: {e}")
 
 
 if __name__ == "__main__":
@@ -1,57 +1,56 @@
-import pandas as pd
-import sqlite3
-import os
-
-# Ler o arquivo Excel
-df = pd.read_excel('oris.xlsx', header=7)
-
-# Lista para armazenar as colunas selecionadas
-colunas_selecionadas = []
-
-print("=" * 60)
-print("SELEÇÃO DE COLUNAS PARA CRIAR BANCO DE DADOS")
-print("=" * 60)
-print(f"\nTotal de colunas encontradas: {len(df.columns)}\n")
-
-# Perguntar para cada coluna
-for i, coluna in enumerate(df.columns, 1):
-    while True:
-        resposta = input(f"{i}. Coluna '{coluna}' - Usar? (s/n): ").strip().lower()
-        if resposta in ['s', 'sim', 'n', 'não', 'nao']:
-            if resposta in ['s', 'sim']:
-                colunas_selecionadas.append(coluna)
-            break
-        else:
-            print("   Por favor, digite 's' para sim ou 'n' para não.\n")
-
-import pandas as pd
 import sqlite3
 import os
+import sys
 import json
 import argparse
-import sys
 
+# Permite importar o pacote "dados" da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados import DATASETS, caminho_dados, carregar_oris, ler_blocos, localizar_fonte, nome_canonico
 
 # Configurações de arquivos
-EXCEL_FILE = 'oris.xlsx'
-DB_FILE = 'oris.db'
+EXCEL_FILE = caminho_dados('oris.xlsx')
+DB_FILE = caminho_dados('oris.db')
 TABLE_NAME = 'oris'
 SELECTION_FILE = 'col_selection.json'
 
 
-def carregar_df():
-    if os.path.exists(DB_FILE):
+def localizar():
+    try:
+        return localizar_fonte('oris', 'auto')
+    except FileNotFoundError:
+        print(f"Nenhum arquivo encontrado: '{DB_FILE}' nem '{EXCEL_FILE}'.")
+        sys.exit(1)
+
+
+def listar_colunas():
+    """Colunas da fonte (nomes canônicos) sem carregar os dados."""
+    tipo, caminho = localizar()
+    if tipo == 'xlsx':
+        # só o cabeçalho e a primeira linha são lidos
+        blocos = ler_blocos(caminho, tamanho_bloco=1)
         try:
-            conn = sqlite3.connect(DB_FILE)
-            df = pd.read_sql(f"SELECT * FROM {TABLE_NAME}", conn)
+            return list(next(blocos).columns)
+        finally:
+            blocos.close()
+    if tipo == 'sqlite':
+        conn = sqlite3.connect(caminho)
+        try:
+            info = conn.execute(f'PRAGMA table_info("{DATASETS["oris"]["tabela"]}")').fetchall()
+        finally:
             conn.close()
-            return df
-        except Exception:
-            pass
-    if os.path.exists(EXCEL_FILE):
-        return pd.read_excel(EXCEL_FILE, header=7)
-    print(f"Nenhum arquivo encontrado: '{DB_FILE}' nem '{EXCEL_FILE}'.")
-    sys.exit(1)
+        return [nome_canonico(linha[1], 'oris') for linha in info]
+    return list(carregar_oris(fonte=tipo).columns)
+
+
+def carregar_df(colunas=None):
+    """Carrega o oris uma única vez, só com `colunas` quando informadas."""
+    localizar()
+    df = carregar_oris(fonte='auto', colunas=colunas)
+    if colunas:
+        df = df[[c for c in colunas if c in df.columns]]
+    return df
 
 
 def carregar_selecao():
@@ -69,8 +68,7 @@ def salvar_selecao(mapping):
         json.dump(mapping, f, ensure_ascii=False, indent=2)
 
 
-def perguntar_colunas(df, selecao_existente, force_interactive=False):
-    cols = list(df.columns)
+def perguntar_colunas(cols, selecao_existente, force_interactive=False):
     selecionadas = []
 
     print("=" * 60)
@@ -120,15 +118,31 @@ def criar_banco(df_filtrado):
     conn.close()
 
 
+def colunas_do_perfil(selecao):
+    return [c for c, usar in selecao.items() if usar]
+
+
+def gerar_banco(selecionadas):
+    """Lê só as colunas selecionadas (uma leitura projetada) e recria o banco."""
+    df_filtrado = carregar_df(selecionadas)
+    faltando = [c for c in selecionadas if c not in df_filtrado.columns]
+    if faltando:
+        print(f"\n⚠️ Colunas do perfil ausentes na fonte (ignoradas): {', '.join(faltando)}")
+    criar_banco(df_filtrado)
+    print(f"\n✓ Banco de dados '{DB_FILE}' criado com sucesso!")
+    print(f"  Total de linhas: {len(df_filtrado)}")
+    print(f"  Total de colunas: {len(df_filtrado.columns)}")
+
+
 def main():
     parser = argparse.ArgumentParser(description='Criar SQLite a partir de Excel selecionando colunas')
     parser.add_argument('--interactive', '-i', action='store_true', help='Forçar interação para todas as colunas')
     parser.add_argument('--reset', '-r', action='store_true', help='Resetar arquivo de seleção e iniciar do zero')
     parser.add_argument('--show', action='store_true', help='Mostrar seleção salva e sair')
+    parser.add_argument('--aplicar', '-a', action='store_true',
+                        help=f'Recriar o banco com o perfil salvo em {SELECTION_FILE}, sem perguntas')
     args = parser.parse_args()
 
-    df = carregar_df()
-
     selecao_existente = {} if args.reset else carregar_selecao()
 
     if args.show:
@@ -145,18 +159,25 @@ def main():
                 print('  -', c)
         return
 
-    selecionadas, selecao_atualizada = perguntar_colunas(df, selecao_existente, force_interactive=args.interactive)
+    if args.aplicar:
+        selecionadas = colunas_do_perfil(selecao_existente)
+        if not selecionadas:
+            print(f"Nenhuma coluna marcada em '{SELECTION_FILE}'. Rode sem --aplicar para escolher as colunas.")
+            sys.exit(1)
+        print(f"Aplicando perfil salvo ({len(selecionadas)} colunas)...")
+        gerar_banco(selecionadas)
+        return
+
+    selecionadas, selecao_atualizada = perguntar_colunas(
+        listar_colunas(), selecao_existente, force_interactive=args.interactive
+    )
 
     # Salvar seleção para reutilização futura
     salvar_selecao(selecao_atualizada)
 
     confirmacao = input("\nDeseja criar o banco de dados SQLite com essas colunas? (s/n): ").strip().lower()
     if confirmacao in ['s', 'sim']:
-        df_filtrado = df[selecionadas]
-        criar_banco(df_filtrado)
-        print(f"\n✓ Banco de dados '{DB_FILE}' criado com sucesso!")
-        print(f"  Total de linhas: {len(df_filtrado)}")
-        print(f"  Total de colunas: {len(selecionadas)}")
+        gerar_banco(selecionadas)
     else:
         print("\nOperação cancelada.")
 
@@ -1,14 +1,215 @@
+"""
+Inspeção rápida de planilhas: cabeçalho e perfil das colunas a partir de uma amostra
+Uso: python ler_cabecalho.py [arquivo.xlsx] [--amostra 1000] [--max-linhas 2000]
+
+Só o topo da planilha é lido (modo read-only, linha a linha): o cabeçalho é
+detectado automaticamente e as linhas seguintes alimentam uma amostra
+reservatório usada para inferir tipo, percentual de nulos e distintos.
+A amostra sai só das primeiras --max-linhas linhas de dados (as mais antigas,
+na ordem da planilha), não do arquivo inteiro: é o preço de responder em cerca
+de um segundo. Aumente --max-linhas para um perfil mais representativo.
+"""
+
+import os
+import re
+import sys
+import random
+import argparse
+from collections import Counter
+from datetime import date, datetime
+
 import pandas as pd
+from openpyxl import load_workbook
+
+# Permite importar o pacote "dados" da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados import COLUNAS_BASE_BI, COLUNAS_ORIS, caminho_dados, detectar_cabecalho
+
+# Linhas de dados lidas por padrão: ~1,4s numa planilha de 37 colunas
+MAX_LINHAS = 2000
+
+PADRAO_DATA = re.compile(r"^\d{1,2}/\d{1,2}/\d{2,4}$")
+
+
+def tipo_valor(valor):
+    """Classifica um valor lido pelo openpyxl"""
+    if valor is None or (isinstance(valor, str) and not valor.strip()):
+        return None
+    if isinstance(valor, bool):
+        return "booleano"
+    if isinstance(valor, (datetime, date)):
+        return "data"
+    if isinstance(valor, int):
+        return "inteiro"
+    if isinstance(valor, float):
+        return "inteiro" if valor.is_integer() else "decimal"
+    if PADRAO_DATA.match(str(valor).strip()):
+        return "data"
+    return "texto"
+
+
+def estimar_distintos(valores, total_linhas):
+    """
+    Estima os valores distintos da coluna inteira a partir da amostra
+
+    Usa o estimador GEE (Charikar et al.): valores vistos uma única vez na
+    amostra são escalados por sqrt(N/n); os repetidos contam uma vez.
+    """
+    n = len(valores)
+    if n == 0:
+        return 0
+    frequencias = Counter(Counter(valores).values())
+    f1 = frequencias.get(1, 0)
+    if f1 == n:
+        return max(total_linhas, n)  # nada se repetiu: provável identificador
+    repetidos = sum(q for vezes, q in frequencias.items() if vezes > 1)
+    escala = (max(total_linhas, n) / n) ** 0.5
+    return int(round(escala * f1 + repetidos))
+
+
+def ler_amostra(caminho, header, tamanho_amostra, max_linhas, linhas_exemplo, seed, planilha=None):
+    """
+    Lê o cabeçalho e até max_linhas linhas de dados em streaming
+
+    A amostra reservatório é uniforme só entre as linhas lidas: com a planilha
+    maior que max_linhas, ela representa o começo do arquivo, não o todo.
+
+    Returns:
+        Tupla (colunas, primeiras linhas, amostra, linhas lidas, total estimado)
+    """
+    rng = random.Random(seed)
+    wb = load_workbook(caminho, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb[planilha] if planilha else wb.worksheets[0]
+        # Dimensão declarada no arquivo (não exige ler a planilha inteira)
+        total_estimado = max((ws.max_row or 0) - header - 1, 0)
+
+        linhas = ws.iter_rows(values_only=True)
+        for _ in range(header):
+            next(linhas, None)
+        bruto = next(linhas, None) or ()
+        colunas = [
+            str(c).strip() if c is not None else f"Unnamed: {i}"
+            for i, c in enumerate(bruto)
+        ]
+
+        primeiras, amostra, lidas, completa = [], [], 0, True
+        for linha in linhas:
+            if lidas >= max_linhas:
+                completa = False
+                break
+            if all(v is None for v in linha):
+                continue
+            lidas += 1
+            linha = tuple(linha[: len(colunas)]) + (None,) * (len(colunas) - len(linha))
+            if len(primeiras) < linhas_exemplo:
+                primeiras.append(linha)
+            # Amostragem reservatório (algoritmo R)
+            if len(amostra) < tamanho_amostra:
+                amostra.append(linha)
+            else:
+                j = rng.randrange(lidas)
+                if j < tamanho_amostra:
+                    amostra[j] = linha
+    finally:
+        wb.close()
+
+    # Se a planilha foi lida até o fim, o total é exato
+    total = lidas if completa else max(total_estimado, lidas)
+    return colunas, primeiras, amostra, lidas, total
+
+
+def perfilar_colunas(colunas, amostra, total_linhas):
+    """Tipo predominante, percentual de nulos e distintos estimados de cada coluna"""
+    perfil = []
+    for i, coluna in enumerate(colunas):
+        valores = [linha[i] for linha in amostra]
+        tipos = [tipo_valor(v) for v in valores]
+        preenchidos = [v for v, t in zip(valores, tipos) if t is not None]
+        contagem_tipos = Counter(t for t in tipos if t is not None)
+
+        if contagem_tipos:
+            tipo, qtd = contagem_tipos.most_common(1)[0]
+            if len(contagem_tipos) > 1:
+                tipo = f"{tipo} ({qtd / len(preenchidos):.0%})"
+        else:
+            tipo = "vazio"
+
+        perfil.append(
+            {
+                "Coluna": coluna,
+                "Tipo": tipo,
+                "Nulos (%)": round(100 * (1 - len(preenchidos) / len(valores)), 1)
+                if valores
+                else 100.0,
+                "Distintos (est.)": estimar_distintos(
+                    [str(v) for v in preenchidos],
+                    round(total_linhas * len(preenchidos) / len(valores)) if valores else 0,
+                ),
+                "Exemplo": str(preenchidos[0])[:40] if preenchidos else "",
+            }
+        )
+    return pd.DataFrame(perfil)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspecionar cabeçalho e perfil das colunas de uma planilha')
+    parser.add_argument('arquivo', nargs='?', default=caminho_dados('oris.xlsx'), help='Planilha .xlsx (padrão: oris.xlsx)')
+    parser.add_argument('--header', default='auto', help="Linha do cabeçalho (0-based) ou 'auto'")
+    parser.add_argument('--planilha', help='Nome da aba (padrão: primeira)')
+    parser.add_argument('--amostra', type=int, default=1000, help='Tamanho da amostra reservatório')
+    parser.add_argument('--max-linhas', type=int, default=MAX_LINHAS,
+                        help=f'Máximo de linhas de dados lidas (padrão: {MAX_LINHAS}); a amostra '
+                             'sai só dessas primeiras linhas, não da planilha inteira')
+    parser.add_argument('--exemplo', type=int, default=5, help='Quantidade de linhas exibidas')
+    parser.add_argument('--seed', type=int, default=42, help='Semente da amostragem')
+    parser.add_argument('--so-cabecalho', action='store_true', help='Mostrar apenas o cabeçalho e sair')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.arquivo):
+        print(f"Erro: Arquivo '{args.arquivo}' não encontrado.")
+        sys.exit(1)
+
+    if args.header == 'auto':
+        try:
+            header = detectar_cabecalho(args.arquivo, COLUNAS_ORIS + COLUNAS_BASE_BI, planilha=args.planilha)
+        except ValueError as e:
+            print(f"Erro: {e}")
+            sys.exit(1)
+    else:
+        header = int(args.header)
+
+    colunas, primeiras, amostra, lidas, total = ler_amostra(
+        args.arquivo,
+        header,
+        0 if args.so_cabecalho else args.amostra,
+        0 if args.so_cabecalho else args.max_linhas,
+        args.exemplo,
+        args.seed,
+        args.planilha,
+    )
+
+    # Exibir as colunas do cabeçalho
+    print(f"Cabeçalho da planilha (linha {header + 1}):")
+    print(colunas)
+    print(f"\nTotal de colunas: {len(colunas)}")
+
+    if args.so_cabecalho:
+        return
+
+    print(f"Total de linhas de dados: {total}" + ("" if lidas == total else " (estimado pela dimensão do arquivo)"))
+    print(f"Linhas lidas: {lidas} | Amostra: {len(amostra)}")
+    if lidas < total:
+        print(f"⚠️ A amostra cobre só as primeiras {lidas} linhas de dados (use --max-linhas para ler mais)")
+
+    print(f"\nPrimeiras {len(primeiras)} linhas de dados:")
+    print(pd.DataFrame(primeiras, columns=colunas))
 
-# Ler o cabeçalho da planilha oris.xlsx na linha 8
-# header=7 porque pandas usa índice 0-based (linha 8 = índice 7)
-df = pd.read_excel('oris.xlsx', header=7)
+    print(f"\nPerfil das colunas (a partir da amostra das primeiras {lidas} linhas):")
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(perfilar_colunas(colunas, amostra, total).to_string(index=False))
 
-# Exibir as colunas do cabeçalho
-print("Cabeçalho da planilha:")
-print(df.columns.tolist())
 
-# Exibir informações adicionais
-print(f"\nTotal de colunas: {len(df.columns)}")
-print(f"\nPrimeiras 5 linhas de dados:")
-print(df.head())
+if __name__ == '__main__':
+    main()
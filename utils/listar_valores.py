@@ -0,0 +1,172 @@
+"""
+Valores distintos (com contagem) de uma ou mais colunas do oris.db
+Uso: python listar_valores.py "Centro custo" ["Cargo" ...] [--formato texto|csv|json]
+
+Na primeira consulta de uma combinação de colunas é criado um índice que
+cobre o GROUP BY, e o resultado fica em cache no disco com a versão do banco
+(tamanho + data de modificação): consultas repetidas não tocam a tabela.
+"""
+
+import os
+import sys
+import csv
+import glob
+import json
+import hashlib
+import sqlite3
+import argparse
+
+# Permite importar o pacote "dados" da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados import DIRETORIO_CACHE, assinatura_arquivo, caminho_dados, chave_coluna
+
+DB_FILE = caminho_dados('oris.db')
+TABLE = 'oris'
+
+
+def resolver_colunas(conn, tabela, colunas):
+    """Traduz os nomes pedidos para os nomes gravados no banco (sem diferenciar caixa/acentos)."""
+    existentes = [linha[1] for linha in conn.execute(f'PRAGMA table_info("{tabela}")')]
+    if not existentes:
+        raise ValueError(f"Tabela '{tabela}' não encontrada")
+    por_chave = {chave_coluna(c): c for c in existentes}
+    faltando = [c for c in colunas if chave_coluna(c) not in por_chave]
+    if faltando:
+        raise ValueError(
+            f"Coluna(s) não encontrada(s): {', '.join(faltando)}. "
+            f"Disponíveis: {', '.join(existentes)}"
+        )
+    return [por_chave[chave_coluna(c)] for c in colunas]
+
+
+def garantir_indice(conn, tabela, colunas):
+    """Cria (se faltar) o índice que cobre o GROUP BY das colunas; ignora bancos somente leitura."""
+    nome = 'idx_' + '__'.join(
+        ''.join(c if c.isalnum() else '_' for c in col.lower()) for col in colunas
+    )
+    definicao = ', '.join(f'"{c}"' for c in colunas)
+    try:
+        with conn:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "{nome}" ON "{tabela}" ({definicao})')
+    except sqlite3.OperationalError as e:
+        print(f"Aviso: índice não criado ({e}); a consulta fará uma varredura completa.", file=sys.stderr)
+
+
+def versao_banco(arquivo_db):
+    """Versão do banco: assinatura do arquivo principal e do -wal, se houver."""
+    wal = arquivo_db + '-wal'
+    return assinatura_arquivo(arquivo_db) + (assinatura_arquivo(wal) if os.path.exists(wal) else ())
+
+
+def consultar_valores(conn, tabela, colunas, incluir_nulos=False):
+    """Lista (valores..., contagem) agrupando pelas colunas, em ordem alfabética sem caixa."""
+    selecao = ', '.join(f'"{c}"' for c in colunas)
+    ordem = ', '.join(f'"{c}" COLLATE NOCASE' for c in colunas)
+    filtro = '' if incluir_nulos else 'WHERE ' + ' AND '.join(f'"{c}" IS NOT NULL' for c in colunas)
+    q = f'SELECT {selecao}, COUNT(*) FROM "{tabela}" {filtro} GROUP BY {selecao} ORDER BY {ordem}'
+    return [list(linha) for linha in conn.execute(q)]
+
+
+def _caminho_cache(arquivo_db, tabela, colunas, incluir_nulos, versao):
+    consulta = json.dumps([os.path.abspath(arquivo_db), tabela, colunas, incluir_nulos])
+    chave = hashlib.sha1(consulta.encode('utf-8')).hexdigest()[:16]
+    sufixo = '-'.join(str(v) for v in versao)
+    return os.path.join(DIRETORIO_CACHE, f'valores-{chave}-{sufixo}.json'), chave
+
+
+def listar_valores(arquivo_db, colunas, tabela=TABLE, incluir_nulos=False, usar_cache=True, criar_indice=True):
+    """
+    Valores distintos e contagens de uma combinação de colunas
+
+    Returns:
+        Tupla (nomes das colunas no banco, linhas [valor, ..., contagem])
+    """
+    conn = sqlite3.connect(arquivo_db)
+    try:
+        colunas = resolver_colunas(conn, tabela, colunas)
+        if criar_indice:
+            garantir_indice(conn, tabela, colunas)
+
+        # A versão é lida depois do índice: criá-lo altera o arquivo
+        versao = versao_banco(arquivo_db)
+        caminho_cache, chave = _caminho_cache(arquivo_db, tabela, colunas, incluir_nulos, versao)
+        if usar_cache and os.path.exists(caminho_cache):
+            try:
+                with open(caminho_cache, 'r', encoding='utf-8') as f:
+                    return colunas, json.load(f)
+            except (OSError, ValueError):
+                pass  # cache corrompido: consulta de novo
+
+        linhas = consultar_valores(conn, tabela, colunas, incluir_nulos)
+    finally:
+        conn.close()
+
+    if usar_cache:
+        try:
+            os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+            temporario = caminho_cache + '.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(linhas, f, ensure_ascii=False, default=str)
+            os.replace(temporario, caminho_cache)
+            for antigo in glob.glob(os.path.join(DIRETORIO_CACHE, f'valores-{chave}-*.json')):
+                if antigo != caminho_cache:
+                    os.remove(antigo)
+        except OSError:
+            pass  # sem cache em disco, o resultado continua válido
+    return colunas, linhas
+
+
+def imprimir(colunas, linhas, formato, saida=sys.stdout):
+    if formato == 'csv':
+        escritor = csv.writer(saida)
+        escritor.writerow(colunas + ['Quantidade'])
+        escritor.writerows(linhas)
+    elif formato == 'json':
+        registros = [dict(zip(colunas + ['Quantidade'], linha)) for linha in linhas]
+        json.dump(registros, saida, ensure_ascii=False, indent=2, default=str)
+        saida.write('\n')
+    else:
+        rotulo = ' + '.join(f'"{c}"' for c in colunas)
+        if not linhas:
+            print(f'Nenhum valor encontrado em {rotulo}.', file=saida)
+            return
+        print(f'Total distintos: {len(linhas)}', file=saida)
+        for linha in linhas:
+            valores = ' | '.join('' if v is None else str(v) for v in linha[:-1])
+            print(f'{valores}  ({linha[-1]})', file=saida)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Listar valores distintos (com contagem) de colunas do oris.db')
+    parser.add_argument('colunas', nargs='+', help='Uma ou mais colunas (a combinação é agrupada)')
+    parser.add_argument('--banco', default=DB_FILE, help='Banco SQLite (padrão: oris.db)')
+    parser.add_argument('--tabela', default=TABLE, help=f'Tabela (padrão: {TABLE})')
+    parser.add_argument('--formato', choices=['texto', 'csv', 'json'], default='texto', help='Formato da saída')
+    parser.add_argument('--incluir-nulos', action='store_true', help='Incluir combinações com valores vazios')
+    parser.add_argument('--sem-cache', action='store_true', help='Ignorar o cache em disco')
+    parser.add_argument('--sem-indice', action='store_true', help='Não criar índice no banco')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.banco):
+        print(f"Erro: '{args.banco}' não encontrado. Execute 'transformar_excel_sqlite.py' primeiro.")
+        sys.exit(1)
+
+    try:
+        colunas, linhas = listar_valores(
+            args.banco,
+            args.colunas,
+            tabela=args.tabela,
+            incluir_nulos=args.incluir_nulos,
+            usar_cache=not args.sem_cache,
+            criar_indice=not args.sem_indice,
+        )
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Erro ao acessar {args.banco}: {e}")
+        sys.exit(1)
+
+    imprimir(colunas, linhas, args.formato)
+
+
+if __name__ == '__main__':
+    main()
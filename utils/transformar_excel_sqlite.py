@@ -1,60 +1,145 @@
-import pandas as pd
 import sqlite3
 import os
+import sys
 
+# Permite importar o pacote "dados" da raiz do projeto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados import COLUNAS_DATA_ORIS, caminho_dados, converter_data, ler_blocos
+
+TAMANHO_BLOCO = 5000
+
+# Colunas usadas nos filtros dos dashboards e scripts (recebem índice)
+COLUNAS_INDICE = [
+    'Nome Fantasia',
+    'Centro custo',
+    'Cargo',
+    'Demitido',
+    'Dt Admissão',
+    'Dt Rescisão',
+]
+
+
+def inferir_tipos(bloco):
+    """Define o tipo SQLite de cada coluna a partir do primeiro bloco lido."""
+    tipos = {}
+    for col in bloco.columns:
+        valores = bloco[col].dropna()
+        if col in COLUNAS_DATA_ORIS:
+            tipos[col] = 'DATE'  # texto ISO (AAAA-MM-DD), ordenável e comparável
+        elif len(valores) and all(isinstance(v, int) and not isinstance(v, bool) for v in valores):
+            tipos[col] = 'INTEGER'
+        elif len(valores) and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in valores):
+            tipos[col] = 'REAL'
+        else:
+            tipos[col] = 'TEXT'
+    return tipos
+
+
+def preparar_bloco(bloco, tipos):
+    """Converte o bloco para os tipos do schema (datas em ISO) e devolve as linhas."""
+    for col, tipo in tipos.items():
+        if tipo == 'DATE':
+            bloco[col] = converter_data(bloco[col]).dt.strftime('%Y-%m-%d')
+    bloco = bloco.astype(object).where(bloco.notna(), None)
+    return list(bloco.itertuples(index=False, name=None))
+
+
+def sincronizar_arquivo(caminho):
+    """Garante no disco o conteúdo já escrito do arquivo (fsync)"""
+    with open(caminho, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def sincronizar_diretorio(caminho):
+    """Garante no disco a troca de nomes feita na pasta (sem efeito no Windows)"""
+    if os.name == 'nt':
+        return
+    fd = os.open(caminho, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def transformar_excel_para_sqlite(arquivo_excel, arquivo_db, tabela_nome='oris', tamanho_bloco=TAMANHO_BLOCO):
+    """Transforma um arquivo Excel em banco de dados SQLite, em blocos e sem derrubar o banco atual."""
 
-def transformar_excel_para_sqlite(arquivo_excel, arquivo_db, tabela_nome='oris'):
-    """Transforma um arquivo Excel em banco de dados SQLite."""
-    
     if not os.path.exists(arquivo_excel):
         print(f"Erro: Arquivo '{arquivo_excel}' não encontrado.")
         return False
-    
-    print(f"Lendo arquivo Excel: {arquivo_excel}")
-    
-    try:
-        # Tentar ler como arquivo selecionado (sem header específico)
-        df = pd.read_excel(arquivo_excel)
-    except Exception as e:
-        print(f"Erro ao ler Excel: {e}")
-        return False
-    
-    print(f"Total de linhas: {len(df)}")
-    print(f"Total de colunas: {len(df.columns)}")
-    print(f"\nColunas encontradas:")
-    for i, col in enumerate(df.columns, 1):
-        print(f"  {i}. {col}")
-    
-    # Remover arquivo de banco existente
-    if os.path.exists(arquivo_db):
-        os.remove(arquivo_db)
-        print(f"\nArquivo '{arquivo_db}' existente foi removido.")
-    
-    # Criar conexão e inserir dados
-    print(f"\nCriando banco de dados: {arquivo_db}")
-    conexao = sqlite3.connect(arquivo_db)
-    
+
+    print(f"Lendo arquivo Excel em blocos de {tamanho_bloco} linhas: {arquivo_excel}")
+
+    # O banco novo é montado ao lado e só substitui o atual quando estiver completo
+    arquivo_tmp = arquivo_db + '.novo'
+    for sobra in (arquivo_tmp, arquivo_tmp + '-wal', arquivo_tmp + '-shm'):
+        if os.path.exists(sobra):
+            os.remove(sobra)
+
+    conexao = sqlite3.connect(arquivo_tmp)
+    total_linhas = 0
+
     try:
-        df.to_sql(tabela_nome, conexao, index=False, if_exists='replace')
+        conexao.execute('PRAGMA journal_mode=WAL')
+        conexao.execute('PRAGMA synchronous=OFF')  # arquivo temporário: descartado se falhar
+
+        tipos = None
+        conexao.execute('BEGIN')
+        for bloco in ler_blocos(arquivo_excel, tamanho_bloco=tamanho_bloco):
+            if tipos is None:
+                tipos = inferir_tipos(bloco)
+                print(f"Total de colunas: {len(tipos)}")
+                print("\nColunas encontradas:")
+                for i, (col, tipo) in enumerate(tipos.items(), 1):
+                    print(f"  {i}. {col} ({tipo})")
+
+                definicao = ', '.join(f'"{col}" {tipo}' for col, tipo in tipos.items())
+                conexao.execute(f'CREATE TABLE "{tabela_nome}" ({definicao})')
+                marcadores = ', '.join('?' for _ in tipos)
+                insert = f'INSERT INTO "{tabela_nome}" VALUES ({marcadores})'
+
+            conexao.executemany(insert, preparar_bloco(bloco, tipos))
+            total_linhas += len(bloco)
+            print(f"  ... {total_linhas} linhas inseridas", end='\r')
+
+        print("\nCriando índices...")
+        for col in COLUNAS_INDICE:
+            if col in tipos:
+                nome_indice = 'idx_' + ''.join(c if c.isalnum() else '_' for c in col.lower())
+                conexao.execute(f'CREATE INDEX "{nome_indice}" ON "{tabela_nome}" ("{col}")')
+        conexao.commit()
+
+        # Volta ao modo rollback antes da troca: um banco em WAL depende dos
+        # arquivos -wal/-shm pelo nome, o que não combina com substituir o arquivo
+        conexao.execute('PRAGMA journal_mode=DELETE')
         conexao.close()
-        
-        print(f"\n✓ Banco de dados criado com sucesso!")
-        print(f"  Tabela: {tabela_nome}")
-        print(f"  Linhas: {len(df)}")
-        print(f"  Colunas: {len(df.columns)}")
-        print(f"  Arquivo: {arquivo_db}")
-        
-        return True
     except Exception as e:
         conexao.close()
-        print(f"Erro ao criar banco de dados: {e}")
+        os.remove(arquivo_tmp)
+        print(f"\nErro ao criar banco de dados: {e}")
         return False
 
+    # Com synchronous=OFF nada garante que o banco já está no disco: sincroniza
+    # antes da troca, e a pasta depois, para uma queda não publicar um banco truncado
+    sincronizar_arquivo(arquivo_tmp)
+    # Troca atômica: leitores veem o banco antigo ou o novo, nunca um banco pela metade
+    os.replace(arquivo_tmp, arquivo_db)
+    sincronizar_diretorio(os.path.dirname(os.path.abspath(arquivo_db)))
+
+    print("\n✓ Banco de dados criado com sucesso!")
+    print(f"  Tabela: {tabela_nome}")
+    print(f"  Linhas: {total_linhas}")
+    print(f"  Colunas: {len(tipos)}")
+    print(f"  Arquivo: {arquivo_db}")
+
+    return True
+
 
 def main():
-    arquivo_excel = 'oris_selecionado.xlsx'
-    arquivo_db = 'oris.db'
-    
+    arquivo_excel = caminho_dados('oris_selecionado.xlsx')
+    arquivo_db = caminho_dados('oris.db')
+
     transformar_excel_para_sqlite(arquivo_excel, arquivo_db)
 
 
@@ -0,0 +1,258 @@
+"""
+Vincula as vagas da Base_Bi.xlsx às movimentações do oris (demissões e admissões)
+Uso: python vinculos.py
+
+A tabela vai para um banco próprio (vinculos.db), não para o oris.db: aquele
+arquivo é recriado inteiro por utils/transformar_excel_sqlite.py e, se ainda
+não existisse, viraria uma fonte "sqlite" sem a tabela oris.
+"""
+
+import sqlite3
+import sys
+
+import pandas as pd
+
+from dados import (
+    caminho_dados,
+    carregar_base_bi,
+    carregar_oris,
+    normalizar_colunas,
+    normalizar_serie,
+)
+
+ARQUIVO_VINCULOS = "vinculos.db"
+TABELA_VINCULOS = "vinculos_vagas"
+
+# Janelas de busca em dias
+JANELA_DEMISSAO_DIAS = 60  # demissão até 60 dias antes da abertura da vaga
+JANELA_ADMISSAO_DIAS = 120  # admissão até 120 dias depois da abertura da vaga
+
+# Coluna do oris usada como "unidade" para casar com a coluna UNIDADE da Base_Bi
+COLUNA_UNIDADE_ORIS = "Centro custo"
+
+
+def _preparar_vagas(df_vagas):
+    """Extrai da Base_Bi apenas as colunas usadas na vinculação, já normalizadas"""
+    df_vagas = normalizar_colunas(df_vagas, "base_bi")
+    return pd.DataFrame(
+        {
+            "Nº Processo": df_vagas["Nº Processo"].values,
+            "_cargo": normalizar_serie(df_vagas["FUNÇÃO"]).values,
+            "_unidade": normalizar_serie(df_vagas["UNIDADE"]).values,
+            "_nome_saida": normalizar_serie(df_vagas["NOME - COLABORADOR"]).values,
+            "_nome_entrada": normalizar_serie(df_vagas["SUBSTITUIDO POR"]).values,
+            "_data": pd.to_datetime(
+                df_vagas["DATA ABERTURA DA VAGA"], errors="coerce"
+            ).astype("datetime64[ns]").values,
+        }
+    )
+
+
+def _preparar_eventos(df_oris, coluna_data, coluna_unidade):
+    """Extrai do oris os eventos (admissão ou demissão) com chaves normalizadas"""
+    eventos = pd.DataFrame(
+        {
+            "ID": df_oris["ID"].values,
+            "Nome": df_oris["Nome"].values,
+            "_cargo": normalizar_serie(df_oris["Cargo"]).values,
+            "_unidade": normalizar_serie(df_oris[coluna_unidade]).values,
+            "_nome": normalizar_serie(df_oris["Nome"]).values,
+            "_data": pd.to_datetime(df_oris[coluna_data], errors="coerce")
+            .astype("datetime64[ns]")
+            .values,
+        }
+    )
+    eventos = eventos[eventos["_data"].notna()]
+    return eventos.reset_index(drop=True).rename_axis("_evento").reset_index()
+
+
+def _dentro_da_janela(dias, direcao, janela_dias):
+    """Verifica se a diferença (evento - vaga) respeita a direção e a janela"""
+    if direcao == "backward":
+        return (dias <= 0) & (dias >= -janela_dias)
+    return (dias >= 0) & (dias <= janela_dias)
+
+
+def _vincular_por_nome(vagas, eventos, coluna_nome, direcao, janela_dias):
+    """Junção por hash em (cargo, nome): o vínculo mais forte, independe da unidade"""
+    candidatos = vagas[vagas[coluna_nome] != ""].merge(
+        eventos,
+        left_on=["_cargo", coluna_nome],
+        right_on=["_cargo", "_nome"],
+        suffixes=("", "_evento"),
+    )
+    dias = (candidatos["_data_evento"] - candidatos["_data"]).dt.days
+    candidatos = candidatos[_dentro_da_janela(dias, direcao, janela_dias)].copy()
+    candidatos["_distancia"] = dias.loc[candidatos.index].abs()
+    candidatos = candidatos.sort_values("_distancia")
+    return candidatos.drop_duplicates("_vaga")[["_vaga", "_evento"]]
+
+
+def _vincular_por_janela(vagas, eventos, direcao, janela_dias):
+    """Junção as-of particionada por hash de (cargo, unidade) dentro da janela"""
+    chaves_vagas = vagas["_cargo"] + "|" + vagas["_unidade"]
+    chaves_eventos = eventos["_cargo"] + "|" + eventos["_unidade"]
+
+    # Particionar pelas chaves comuns aos dois lados (descarta o resto antes do as-of)
+    codigos, _ = pd.factorize(pd.concat([chaves_vagas, chaves_eventos]))
+    vagas = vagas.assign(_chave=codigos[: len(vagas)])
+    eventos = eventos.assign(_chave=codigos[len(vagas):])
+    comuns = set(vagas["_chave"]) & set(eventos["_chave"])
+    vagas = vagas[vagas["_chave"].isin(comuns) & vagas["_data"].notna()]
+    eventos = eventos[eventos["_chave"].isin(comuns)]
+
+    if vagas.empty or eventos.empty:
+        return pd.DataFrame(columns=["_vaga", "_evento"])
+
+    resultado = pd.merge_asof(
+        vagas[["_vaga", "_chave", "_data"]].sort_values("_data"),
+        eventos[["_evento", "_chave", "_data"]].sort_values("_data"),
+        on="_data",
+        by="_chave",
+        direction=direcao,
+        tolerance=pd.Timedelta(days=janela_dias),
+    )
+    resultado = resultado.dropna(subset=["_evento"])
+    resultado["_evento"] = resultado["_evento"].astype(int)
+    return resultado[["_vaga", "_evento"]]
+
+
+def _vincular_rodada(vagas, eventos, coluna_nome, direcao, janela_dias):
+    """Melhor evento de cada vaga (nome, depois janela), sem repetir evento entre vagas"""
+    por_nome = _vincular_por_nome(vagas, eventos, coluna_nome, direcao, janela_dias)
+    por_nome["_criterio"] = "NOME"
+
+    restantes_vagas = vagas[~vagas["_vaga"].isin(por_nome["_vaga"])]
+    restantes_eventos = eventos[~eventos["_evento"].isin(por_nome["_evento"])]
+    por_janela = _vincular_por_janela(
+        restantes_vagas, restantes_eventos, direcao, janela_dias
+    )
+    por_janela["_criterio"] = "JANELA"
+
+    vinculos = pd.concat([por_nome, por_janela], ignore_index=True)
+    vinculos = vinculos.merge(
+        vagas[["_vaga", "_data"]], on="_vaga"
+    ).merge(
+        eventos[["_evento", "ID", "Nome", "_data"]],
+        on="_evento",
+        suffixes=("", "_evento"),
+    )
+    vinculos["_dias"] = (vinculos["_data_evento"] - vinculos["_data"]).dt.days
+
+    # Evento disputado por mais de uma vaga fica com a vaga mais próxima no tempo
+    vinculos["_distancia"] = vinculos["_dias"].abs()
+    vinculos = vinculos.sort_values(["_criterio", "_distancia"], ascending=[False, True])
+    return vinculos.drop_duplicates("_evento")
+
+
+def _vincular_eventos(vagas, eventos, coluna_nome, direcao, janela_dias):
+    """
+    Combina vínculo por nome e por janela; cada evento é usado por uma vaga só
+
+    A vaga que perde um evento disputado volta na rodada seguinte e fica com o
+    melhor candidato entre os eventos ainda livres. Cada rodada vincula ao
+    menos uma vaga, então o laço termina.
+    """
+    rodadas = []
+    while not vagas.empty and not eventos.empty:
+        rodada = _vincular_rodada(vagas, eventos, coluna_nome, direcao, janela_dias)
+        if rodada.empty:
+            break
+        rodadas.append(rodada)
+        vagas = vagas[~vagas["_vaga"].isin(rodada["_vaga"])]
+        eventos = eventos[~eventos["_evento"].isin(rodada["_evento"])]
+    if not rodadas:
+        colunas = ["_vaga", "_evento", "_criterio", "ID", "Nome", "_data_evento", "_dias"]
+        return pd.DataFrame(columns=colunas).set_index("_vaga")
+    return pd.concat(rodadas, ignore_index=True).set_index("_vaga")
+
+
+def vincular_vagas(
+    df_vagas,
+    df_oris,
+    coluna_unidade=COLUNA_UNIDADE_ORIS,
+    janela_demissao_dias=JANELA_DEMISSAO_DIAS,
+    janela_admissao_dias=JANELA_ADMISSAO_DIAS,
+):
+    """
+    Gera a tabela de vínculos vaga -> demissão que a abriu -> admissão que a preencheu
+
+    Args:
+        df_vagas: DataFrame da Base_Bi.xlsx
+        df_oris: DataFrame do oris (xlsx ou oris.db)
+        coluna_unidade: Coluna do oris comparada com UNIDADE da Base_Bi
+        janela_demissao_dias: Dias antes da abertura em que a demissão é procurada
+        janela_admissao_dias: Dias depois da abertura em que a admissão é procurada
+
+    Returns:
+        DataFrame com uma linha por vaga
+    """
+    vagas = _preparar_vagas(df_vagas).rename_axis("_vaga").reset_index()
+    df_oris = normalizar_colunas(df_oris, "oris")
+
+    demitidos = df_oris[df_oris["Demitido"] == "Sim"]
+    demissoes = _preparar_eventos(demitidos, "Dt Rescisão", coluna_unidade)
+    admissoes = _preparar_eventos(df_oris, "Dt Admissão", coluna_unidade)
+
+    vinc_dem = _vincular_eventos(
+        vagas, demissoes, "_nome_saida", "backward", janela_demissao_dias
+    )
+    vinc_adm = _vincular_eventos(
+        vagas, admissoes, "_nome_entrada", "forward", janela_admissao_dias
+    )
+
+    tabela = pd.DataFrame(
+        {
+            "Nº Processo": vagas["Nº Processo"],
+            "Data Abertura": vagas["_data"],
+            "ID Demissão": vinc_dem["ID"].reindex(vagas["_vaga"]).values,
+            "Nome Demissão": vinc_dem["Nome"].reindex(vagas["_vaga"]).values,
+            "Dt Rescisão": vinc_dem["_data_evento"].reindex(vagas["_vaga"]).values,
+            "Critério Demissão": vinc_dem["_criterio"].reindex(vagas["_vaga"]).values,
+            "ID Admissão": vinc_adm["ID"].reindex(vagas["_vaga"]).values,
+            "Nome Admissão": vinc_adm["Nome"].reindex(vagas["_vaga"]).values,
+            "Dt Admissão": vinc_adm["_data_evento"].reindex(vagas["_vaga"]).values,
+            "Critério Admissão": vinc_adm["_criterio"].reindex(vagas["_vaga"]).values,
+            "Dias até Admissão": vinc_adm["_dias"].reindex(vagas["_vaga"]).values,
+        }
+    )
+    return tabela
+
+
+def salvar_vinculos(tabela, arquivo_db, tabela_nome=TABELA_VINCULOS):
+    """Materializa a tabela de vínculos no SQLite (vinculos.db), indexada por processo"""
+    conn = sqlite3.connect(arquivo_db)
+    try:
+        tabela.to_sql(tabela_nome, conn, index=False, if_exists="replace")
+        conn.execute(
+            f'CREATE INDEX IF NOT EXISTS "idx_{tabela_nome}_processo" '
+            f'ON "{tabela_nome}" ("Nº Processo")'
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def main():
+    arquivo_db = caminho_dados(ARQUIVO_VINCULOS)
+
+    try:
+        print("Lendo vagas da Base_Bi...")
+        df_vagas = carregar_base_bi()
+        print("Lendo movimentações do oris...")
+        df_oris = carregar_oris()
+    except FileNotFoundError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+
+    tabela = vincular_vagas(df_vagas, df_oris)
+    salvar_vinculos(tabela, arquivo_db)
+
+    print(f"\n✓ Vínculos gerados: {len(tabela)} vagas")
+    print(f"  Com demissão vinculada: {tabela['ID Demissão'].notna().sum()}")
+    print(f"  Com admissão vinculada: {tabela['ID Admissão'].notna().sum()}")
+    print(f"  Tabela: {TABELA_VINCULOS} ({arquivo_db})")
+
+
+if __name__ == "__main__":
+    main()